@@ -4,20 +4,21 @@ import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, font as tkfont, simpledialog, colorchooser
 import traceback
-import pandas as pd
-from reportlab.lib import colors as reportlab_colors # Renamed to avoid clash
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.colors import Color # Needed for custom RGB colors in PDF
+# pandas/numpy, reportlab and xlsxwriter are imported inside the functions that use them,
+# so the splash screen and an idle app don't pay for loading them
 import datetime
 import platform
 from operator import itemgetter
 import csv
-import xlsxwriter
+import subprocess
 import sqlite3
 import json
+import functools
+import itertools
 import time
+import atexit
+import re
+from collections import namedtuple, ChainMap
 
 # --- Configuration & Helpers (From Script 1) ---
 
@@ -39,16 +40,38 @@ def resource_path(relative_path):
     return os.path.join(resource_dir, relative_path)
 
 
-# Use placeholder paths if logos don't exist or cannot be found
+# Logo files, looked up lazily by the PDF export (placeholder is used if they can't be found)
 DEFAULT_LEFT_LOGO = resource_path("left_logo.png")
 DEFAULT_RIGHT_LOGO = resource_path("right_logo.png")
 
-# Check if logo files exist, otherwise use None or a placeholder mechanism
-LEFT_LOGO_PATH = DEFAULT_LEFT_LOGO if os.path.exists(DEFAULT_LEFT_LOGO) else None
-RIGHT_LOGO_PATH = DEFAULT_RIGHT_LOGO if os.path.exists(DEFAULT_RIGHT_LOGO) else None
+@functools.lru_cache(maxsize=None)
+def _get_logo(path):
+    """Returns the logo path if the file exists, otherwise None (checked once per path)."""
+    return path if os.path.exists(path) else None
+
+@functools.lru_cache(maxsize=None)
+def _get_logo_reader(path):
+    """Returns a ReportLab ImageReader for a logo, decoded once and reused by every PDF export."""
+    from reportlab.lib.utils import ImageReader
+    return ImageReader(path)
+
+def _logo_image(path, width, height):
+    """Returns a ReportLab Image flowable for a logo, reusing the image decoded by _get_logo_reader."""
+    from reportlab.platypus import Image
+    image = Image(path, width=width, height=height)
+    # Relies on ReportLab's Image internals: it keeps its ImageReader in the private _img slot
+    # and only decodes the file when that is unset, so setting it skips decoding the logo again
+    image._img = _get_logo_reader(path)
+    return image
 # Ensure app_icon.ico is also in the resources folder or adjust path
 APP_ICON_PATH = resource_path("app_icon.ico")
 
+# Verbose debug output (set QFT_DEBUG=1 to enable)
+DEBUG = os.environ.get('QFT_DEBUG') == '1'
+
+# Rows per DataFrame chunk when reading import files
+IMPORT_CHUNK_ROWS = 50000
+
 
 def get_app_data_dir():
     """Get the appropriate application data directory for settings and database."""
@@ -82,10 +105,75 @@ def get_app_data_dir():
 SETTINGS_FILE = os.path.join(get_app_data_dir(), 'qft_settings.json')
 DATABASE_FILE = os.path.join(get_app_data_dir(), 'qft_database.db') # Match DB name from script 2 if intended
 
+# Hot queries kept as constants so sqlite3's statement cache always sees the same SQL text
+SQL_INSERT_RESULT = '''
+    INSERT INTO results (
+        session_id, barcode, nil_result, tb1_result, tb2_result, mit_result,
+        tb1_nil, tb2_nil, mit_nil, qft_result, requested_date
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+SQL_SELECT_SESSION_RESULTS = '''
+    SELECT barcode, nil_result, tb1_result, tb2_result, mit_result,
+           tb1_nil, tb2_nil, mit_nil, qft_result, requested_date
+    FROM results
+    WHERE session_id = ?
+'''
+SQL_SEARCH_BARCODE = '''
+    SELECT
+        s.session_name, r.barcode, r.nil_result, r.tb1_result, r.tb2_result, r.mit_result,
+        r.tb1_nil, r.tb2_nil, r.mit_nil, r.qft_result, r.requested_date
+    FROM results r
+    JOIN sessions s ON r.session_id = s.session_id
+    WHERE r.barcode LIKE ?
+    ORDER BY s.last_modified DESC, r.requested_date DESC
+'''
+SQL_FIND_SESSION_BY_NAME = "SELECT session_id FROM sessions WHERE session_name = ?"
+# Per-session summary shown in Manage Sessions: worked out once when a session is saved and stored
+# on the sessions row, so opening the dialog doesn't aggregate the whole results table
+SQL_SESSION_SUMMARY = '''
+    SELECT
+        COUNT(result_id),
+        SUM(CASE WHEN qft_result = 'POS' OR qft_result = 'POS*' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN qft_result = 'NEG' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN qft_result = 'IND' THEN 1 ELSE 0 END),
+        MIN(requested_date),
+        MAX(requested_date)
+    FROM results
+    WHERE session_id = ?
+'''
+SQL_UPDATE_SESSION_SUMMARY = '''
+    UPDATE sessions
+    SET total_samples = ?, pos = ?, neg = ?, ind = ?, earliest_date = ?, latest_date = ?
+    WHERE session_id = ?
+'''
+_SESSION_SUMMARY_COLUMNS = (('total_samples', 'INTEGER'), ('pos', 'INTEGER'), ('neg', 'INTEGER'),
+                            ('ind', 'INTEGER'), ('earliest_date', 'TEXT'), ('latest_date', 'TEXT'))
+
+def _update_session_summary(cursor, session_id):
+    """Recomputes the stored Manage Sessions summary columns for one session (an index seek on its results)."""
+    cursor.execute(SQL_SESSION_SUMMARY, (session_id,))
+    cursor.execute(SQL_UPDATE_SESSION_SUMMARY, (*cursor.fetchone(), session_id))
+
+# Stored in PRAGMA user_version once the one-off orphan cleanup in get_database_connection has run
+_DB_SCHEMA_VERSION = 1
+
+# Single long-lived connection shared by the whole app (Tk runs everything on one thread)
+_DB_CONN = None
+
 def get_database_connection():
-    """Get a connection to the database, creating it if necessary."""
+    """Get the shared connection to the database, creating and initializing it on first use."""
+    global _DB_CONN
+    if _DB_CONN is not None:
+        return _DB_CONN
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        # Larger statement cache so the hot queries below stay prepared
+        conn = sqlite3.connect(DATABASE_FILE, cached_statements=256)
+        # Tune the connection: WAL journal (one fsync per checkpoint, readers don't block the writer),
+        # relaxed sync (safe with WAL), in-memory temp tables, 64 MB page cache and 256 MB mmap.
+        # foreign_keys is off by default in SQLite, without it ON DELETE CASCADE never fires
+        for pragma in ('journal_mode=WAL', 'synchronous=NORMAL', 'temp_store=MEMORY',
+                       'cache_size=-64000', 'mmap_size=268435456', 'foreign_keys=ON'):
+            conn.execute('PRAGMA ' + pragma)
         cursor = conn.cursor()
         # Create sessions table (ensure unique constraint on name)
         cursor.execute('''
@@ -93,9 +181,21 @@ def get_database_connection():
                 session_id INTEGER PRIMARY KEY AUTOINCREMENT,
                 session_name TEXT NOT NULL UNIQUE, -- Ensure names are unique
                 import_date TEXT NOT NULL,
-                last_modified TEXT NOT NULL
+                last_modified TEXT NOT NULL,
+                total_samples INTEGER,
+                pos INTEGER,
+                neg INTEGER,
+                ind INTEGER,
+                earliest_date TEXT,
+                latest_date TEXT
             )
         ''')
+        # Databases from before the summary columns: add them (filled in below)
+        cursor.execute('PRAGMA table_info(sessions)')
+        existing_columns = {col_info[1] for col_info in cursor.fetchall()}
+        for col_name, col_type in _SESSION_SUMMARY_COLUMNS:
+            if col_name not in existing_columns:
+                cursor.execute(f'ALTER TABLE sessions ADD COLUMN {col_name} {col_type}')
         # Create results table (ensure foreign key cascade)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS results (
@@ -114,11 +214,26 @@ def get_database_connection():
                 FOREIGN KEY (session_id) REFERENCES sessions (session_id) ON DELETE CASCADE -- Auto-delete results
             )
         ''')
-        # Index for faster searching
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_barcode ON results (barcode)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_session ON results (session_id)')
+        # Composite indexes: (session_id, barcode) serves per-session loads/deletes and
+        # barcode-within-session lookups, (barcode, session_id) covers the global barcode search join
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_session_barcode ON results (session_id, barcode)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_results_barcode_covering ON results (barcode, session_id)')
+        # The old single-column indexes are prefixes of the ones above, drop them to save write cost
+        cursor.execute('DROP INDEX IF EXISTS idx_results_barcode')
+        cursor.execute('DROP INDEX IF EXISTS idx_results_session')
+        # Results left behind by sessions deleted while the cascade wasn't enforced only bloat the
+        # barcode search. Clear them out once, then bump user_version so later launches skip the scan
+        if cursor.execute('PRAGMA user_version').fetchone()[0] < _DB_SCHEMA_VERSION:
+            cursor.execute('DELETE FROM results WHERE session_id NOT IN (SELECT session_id FROM sessions)')
+            cursor.execute(f'PRAGMA user_version = {_DB_SCHEMA_VERSION}')
+        # Sessions without a stored summary yet (saved before the columns existed), one-off
+        cursor.execute('SELECT session_id FROM sessions WHERE total_samples IS NULL')
+        for (pending_id,) in cursor.fetchall():
+            _update_session_summary(cursor, pending_id)
 
         conn.commit()
+        _DB_CONN = conn
+        atexit.register(conn.close) # Close once when the process exits
         return conn
     except sqlite3.Error as e:
         print(f"Database connection/setup error: {str(e)}")
@@ -129,49 +244,41 @@ def get_database_connection():
         messagebox.showerror("Unexpected Error", f"An unexpected error occurred with the database: {str(e)}")
         return None
 
+# Default appearance settings (including WP), shared by load_settings and Reset Defaults
+_DEFAULT_SETTINGS = {
+    'pos_bg': '#FFFFE0',  # Light Yellow (like script 2 default for POS)
+    'neg_bg': '#FFFFFF',  # White
+    'ind_bg': '#FFFFFF',  # White
+    'wp_bg':  '#FFF8DC',  # Cornsilk (light yellowish-orange) - Distinct WP BG
+    'pos_text': '#e53935', # Red
+    'neg_text': '#43a047', # Green
+    'ind_text': '#fb8c00', # Orange
+    'wp_text':  '#D2691E', # Chocolate (darker orange/brown) - Distinct WP text
+    'decimal_places': 'default'
+}
+# The settings that color the results view (row backgrounds and QFT result text)
+_TAG_COLOR_KEYS = ('pos_bg', 'neg_bg', 'ind_bg', 'wp_bg', 'pos_text', 'neg_text', 'ind_text', 'wp_text')
+
 def load_settings():
     """Load settings from JSON file, providing defaults."""
     try:
         with open(SETTINGS_FILE, 'r') as f:
             settings = json.load(f)
-        # Define defaults including WP
-        defaults = {
-            'pos_bg': '#FFFFE0',  # Light Yellow (like script 2 default for POS)
-            'neg_bg': '#FFFFFF',  # White
-            'ind_bg': '#FFFFFF',  # White
-            'wp_bg':  '#FFF8DC',  # Cornsilk (light yellowish-orange) - Distinct WP BG
-            'pos_text': '#e53935', # Red
-            'neg_text': '#43a047', # Green
-            'ind_text': '#fb8c00', # Orange
-            'wp_text':  '#D2691E', # Chocolate (darker orange/brown) - Distinct WP text
-            'decimal_places': 'default'
-        }
-        # Update loaded settings with defaults for any missing keys
-        updated_settings = defaults.copy()
+        # Update loaded settings with defaults for any missing keys (including WP keys)
+        updated_settings = _DEFAULT_SETTINGS.copy()
         updated_settings.update(settings)
-        # Ensure WP keys exist after update, adding if somehow missed
-        if 'wp_bg' not in updated_settings: updated_settings['wp_bg'] = defaults['wp_bg']
-        if 'wp_text' not in updated_settings: updated_settings['wp_text'] = defaults['wp_text']
         return updated_settings
     except (FileNotFoundError, json.JSONDecodeError, TypeError) as e:
         print(f"Settings file not found or invalid ({e}), using defaults.")
         # Return and save default settings if file is missing or corrupt
-        defaults = {
-            'pos_bg': '#FFFFE0', 'neg_bg': '#FFFFFF', 'ind_bg': '#FFFFFF', 'wp_bg': '#FFF8DC',
-            'pos_text': '#e53935', 'neg_text': '#43a047', 'ind_text': '#fb8c00', 'wp_text': '#D2691E',
-            'decimal_places': 'default'
-        }
+        defaults = _DEFAULT_SETTINGS.copy()
         save_settings(defaults) # Save defaults for next time
         return defaults
     except Exception as e:
         print(f"Unexpected error loading settings: {str(e)}")
         messagebox.showerror("Settings Error", f"Could not load settings: {e}. Using defaults.")
         # Return safe defaults
-        return {
-            'pos_bg': '#FFFFE0', 'neg_bg': '#FFFFFF', 'ind_bg': '#FFFFFF', 'wp_bg': '#FFF8DC',
-            'pos_text': '#e53935', 'neg_text': '#43a047', 'ind_text': '#fb8c00', 'wp_text': '#D2691E',
-            'decimal_places': 'default'
-        }
+        return _DEFAULT_SETTINGS.copy()
 
 def save_settings(settings_to_save=None):
     """Save current settings to JSON file."""
@@ -188,17 +295,29 @@ def save_settings(settings_to_save=None):
             json.dump(settings_to_save, f, indent=4) # Use indent for readability
         # Update the global settings variable after saving
         app_settings = settings_to_save
+        # Drop cached number formats (keyed by decimal setting) so old entries don't linger
+        _format_number_cached.cache_clear()
         print(f"Settings saved successfully: {settings_to_save}")
     except Exception as e:
         print(f"Error saving settings: {str(e)}")
         messagebox.showerror("Settings Error", f"Could not save settings: {e}")
 
+# Comparison signs ('<0.05', '>10') stripped before numeric parsing
+_SIGN_TABLE = str.maketrans('', '', '<>') # Strips '<'/'>' from result values in one str.translate pass
+
 # Use Script 1's more robust formatting function
 def format_number_with_decimals(value_str, decimals_setting):
     """Format number string based on decimal setting, preserving special cases."""
     if not isinstance(value_str, str):
         value_str = str(value_str) # Ensure it's a string
-
+    elif not value_str:
+        return " " # Blank cells are common in manual entries, skip the cache lookup for them
+    # Result columns repeat the same few values a lot, so the formatting itself is memoized
+    return _format_number_cached(value_str, decimals_setting)
+
+@functools.lru_cache(maxsize=8192)
+def _format_number_cached(value_str, decimals_setting):
+    """Cached worker for format_number_with_decimals (value_str is always a str)."""
     value_str = value_str.strip()
 
     if not value_str or value_str == " ":
@@ -227,6 +346,84 @@ def format_number_with_decimals(value_str, decimals_setting):
     except (ValueError, TypeError):
         return value_str # Return original if conversion fails
 
+def _to_float(value, _table=_SIGN_TABLE):
+    """Parses a result value like '<0.05' or '>10' to float; blank counts as 0.0 (raises ValueError if not numeric)."""
+    value_str = (value if isinstance(value, str) else str(value)).translate(_table).strip()
+    return float(value_str) if value_str else 0.0
+
+_DB_DATE_FORMAT = '%Y-%m-%d %H:%M:%S' # How requested dates are stored in the database
+_IMPORT_DATE_FORMAT = '%d/%m/%Y %H:%M:%S' # How requested dates appear in imported files
+
+# Samples from one run share their requested date, so the date parsers are memoized by string
+# (datetimes are immutable, sharing one object between rows is safe; failures are not cached and re-raise)
+@functools.lru_cache(maxsize=8192)
+def _parse_db_datetime(value):
+    """Parses a 'YYYY-MM-DD HH:MM:SS' string like strptime(value, _DB_DATE_FORMAT) does (raises ValueError)."""
+    # strptime goes through regex + locale machinery on every call, the fixed-width DB format
+    # can go straight to the C fromisoformat once its shape is checked
+    if len(value) == 19 and value[10] == ' ':
+        digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]
+        if (digits.isascii() and digits.isdigit() and value[4] == value[7] == '-' and value[13] == value[16] == ':'):
+            try:
+                return datetime.datetime.fromisoformat(value)
+            except ValueError:
+                pass # Out of range (e.g. month 13), let strptime raise its usual error
+    return datetime.datetime.strptime(value, _DB_DATE_FORMAT)
+
+@functools.lru_cache(maxsize=8192)
+def _parse_import_datetime(value):
+    """Parses a 'DD/MM/YYYY HH:MM:SS' string like strptime(value, _IMPORT_DATE_FORMAT) does (raises ValueError)."""
+    # Same shortcut as _parse_db_datetime: in the zero-padded fixed-width layout every field sits at
+    # a known position, so the digits go straight into datetime() without strptime's regex matching
+    if len(value) == 19 and value[10] == ' ':
+        digits = value[0:2] + value[3:5] + value[6:10] + value[11:13] + value[14:16] + value[17:19]
+        if (digits.isascii() and digits.isdigit() and value[2] == value[5] == '/' and value[13] == value[16] == ':'):
+            try:
+                return datetime.datetime(int(value[6:10]), int(value[3:5]), int(value[0:2]),
+                                         int(value[11:13]), int(value[14:16]), int(value[17:19]))
+            except ValueError:
+                pass # Out of range (e.g. month 13), let strptime raise its usual error
+    return datetime.datetime.strptime(value, _IMPORT_DATE_FORMAT)
+
+def _parse_requested_date(value):
+    """Returns a row's requested date as a datetime: kept if it already is one, parsed if it is a
+    DB- or import-format string, otherwise None."""
+    if isinstance(value, datetime.datetime):
+        return value # Already correct type
+    if isinstance(value, str):
+        try:
+            return _parse_db_datetime(value) # Expected DB format first (loading a session)
+        except (ValueError, TypeError):
+            try:
+                return _parse_import_datetime(value)
+            except (ValueError, TypeError):
+                return None # Failed parsing string
+    return None # None, or some other non-string/non-datetime type
+
+# The seven numeric result columns (Nil to Mit-Nil), in export column order
+_NUM_KEYS = ('nil_result', 'tb1_result', 'tb2_result', 'mit_result', 'tb1_nil', 'tb2_nil', 'mit_nil')
+_NUM_DEFAULTS = dict.fromkeys(_NUM_KEYS, '')
+_get_num_values = itemgetter(*_NUM_KEYS)
+
+def _num_values(row_dict):
+    """Returns the numeric result values of a row as a tuple in _NUM_KEYS order ('' for missing keys)."""
+    try:
+        return _get_num_values(row_dict) # One itemgetter call instead of seven .get()s
+    except KeyError:
+        return _get_num_values(ChainMap(row_dict, _NUM_DEFAULTS)) # Rare: row without some result keys
+
+# Global search result columns, in tree/export column order
+_SEARCH_ROW_KEYS = ('session_name', 'barcode', *_NUM_KEYS, 'qft_result', 'comment', 'requested_date_str')
+_SEARCH_ROW_DEFAULTS = dict.fromkeys(_SEARCH_ROW_KEYS, '')
+_get_search_row_values = itemgetter(*_SEARCH_ROW_KEYS)
+
+def _search_row_values(row_dict):
+    """Returns a global search result row as a tuple in _SEARCH_ROW_KEYS order ('' for missing keys)."""
+    try:
+        return _get_search_row_values(row_dict) # perform_search fills every key, so this is the usual path
+    except KeyError:
+        return _get_search_row_values(ChainMap(row_dict, _SEARCH_ROW_DEFAULTS))
+
 # Use Script 1's comment calculation logic, but adapt if Script 2's PDF summary needs a specific variation
 def calculate_comment(row_dict):
     """Calculates the comment (WP, High Nil, Low Mit) based on a dictionary of values."""
@@ -234,18 +431,11 @@ def calculate_comment(row_dict):
     qft_result = str(row_dict.get('qft_result', '')).upper() # Ensure uppercase
 
     try:
-        # Use .get() with default 0.0 to handle missing keys gracefully
-        nil_val_str = str(row_dict.get('nil_result', '0')).replace('>', '').replace('<', '').strip()
-        nil_val = float(nil_val_str) if nil_val_str else 0.0
-
-        tb1_nil_str = str(row_dict.get('tb1_nil', '0')).replace('>', '').replace('<', '').strip()
-        tb1_nil = float(tb1_nil_str) if tb1_nil_str else 0.0
-
-        tb2_nil_str = str(row_dict.get('tb2_nil', '0')).replace('>', '').replace('<', '').strip()
-        tb2_nil = float(tb2_nil_str) if tb2_nil_str else 0.0
-
-        mit_nil_str = str(row_dict.get('mit_nil', '0')).replace('>', '').replace('<', '').strip()
-        mit_nil = float(mit_nil_str) if mit_nil_str else 0.0
+        # Use .get() with default '0' to handle missing keys gracefully
+        nil_val = _to_float(row_dict.get('nil_result', '0'))
+        tb1_nil = _to_float(row_dict.get('tb1_nil', '0'))
+        tb2_nil = _to_float(row_dict.get('tb2_nil', '0'))
+        mit_nil = _to_float(row_dict.get('mit_nil', '0'))
 
         if qft_result in ('POS', 'POS*'):
             if tb1_nil >= 1.0 or tb2_nil >= 1.0:
@@ -397,9 +587,59 @@ class CustomContextMenu(tk.Menu):
 
 # --- Core Application Logic (Mostly from Script 1, modified Import if needed) ---
 
+def read_file_chunks(filename, chunksize=None):
+    """Yields the rows of an Excel/CSV import file as string DataFrames of up to chunksize rows."""
+    import pandas as pd
+    chunksize = chunksize or IMPORT_CHUNK_ROWS
+    lower_name = filename.lower()
+
+    if lower_name.endswith('.csv'):
+        # Sniff the delimiter from the first 8 KB so the file is only parsed once
+        with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+            sample = f.read(8192)
+        try:
+            # Sniff on the header line: values may use decimal commas, column names don't
+            delimiter = csv.Sniffer().sniff(sample.split('\n', 1)[0], delimiters=',;\t|').delimiter
+        except csv.Error:
+            delimiter = ';' # Script 2's assumption for LQS exports
+        if DEBUG: print(f"Reading CSV with delimiter {delimiter!r}.")
+        with pd.read_csv(filename, sep=delimiter, engine='c', dtype=str, keep_default_na=False, chunksize=chunksize) as reader:
+            yield from reader
+
+    elif lower_name.endswith('.xlsx'):
+        # Stream rows with openpyxl's read-only mode instead of loading the whole sheet
+        import openpyxl
+        workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+            width = len(columns)
+            batch = []
+            for row in rows:
+                if all(v is None for v in row):
+                    continue # Skip blank rows
+                # Match read_excel(dtype=str, keep_default_na=False): empty cells -> '', rest -> str
+                values = ['' if v is None else str(v) for v in row[:width]]
+                values.extend([''] * (width - len(values)))
+                batch.append(values)
+                if len(batch) >= chunksize:
+                    yield pd.DataFrame(batch, columns=columns)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=columns)
+        finally:
+            workbook.close()
+
+    else: # Legacy .xls - no streaming reader available, read in one go
+        yield pd.read_excel(filename, dtype=str, keep_default_na=False)
+
 def import_data(add_mode=False):
     """Imports data from Excel or CSV files, either replacing or adding (Based on Script 1)."""
     global main_app # Access the main application instance
+    import pandas as pd # Loaded on first import rather than at startup
 
     if not add_mode and main_app.has_data():
         confirm = messagebox.askyesnocancel(
@@ -436,82 +676,64 @@ def import_data(add_mode=False):
         # --- Loop through selected files ---
         for filename in filenames:
             try:
-                print(f"\n--- Processing File: {os.path.basename(filename)} ---")
+                if DEBUG: print(f"\n--- Processing File: {os.path.basename(filename)} ---")
 
-                if filename.lower().endswith('.csv'):
-                    # Try common delimiters; adjust if needed
-                    try:
-                        # Use Script 2's assumption of ';' first, then try ','
-                        df = pd.read_csv(filename, sep=';', dtype=str, keep_default_na=False, low_memory=False)
-                        print(f"Read CSV with ';'. Shape: {df.shape}")
-                        # Basic check: if only one column and more than one potential delimiter, try comma
-                        if df.shape[1] <= 1 and (';' in df.columns[0] or ',' in df.columns[0]):
-                             print("Warning: CSV might have wrong delimiter (read as one column). Trying ','.")
-                             df = pd.read_csv(filename, sep=',', dtype=str, keep_default_na=False, low_memory=False)
-                             print(f"Read CSV with ','. Shape: {df.shape}")
-                    except Exception as read_err:
-                        print(f"Error reading CSV {filename}: {read_err}")
-                        error_files.append(f"{os.path.basename(filename)} (Read Error)")
-                        continue # Skip to next file
-                else: # Excel
-                    try:
-                         df = pd.read_excel(filename, dtype=str, keep_default_na=False)
-                         print(f"Read Excel. Shape: {df.shape}")
-                    except Exception as read_err:
-                         print(f"Error reading Excel {filename}: {read_err}")
-                         error_files.append(f"{os.path.basename(filename)} (Read Error)")
-                         continue # Skip to next file
-
-                # Check if DataFrame is empty after reading
-                if df.empty:
-                    print(f"Skipping {os.path.basename(filename)}: File is empty or could not be read properly.")
-                    error_files.append(f"{os.path.basename(filename)} (Empty or Read Issue)")
-                    continue
-
-                # --- Data Validation/Cleaning ---
-                print(f"Columns found: {list(df.columns)}")
                 # Make sure required_cols matches the actual expected columns from LQS output
                 # These names seem consistent between the scripts' examples
                 required_cols = ['Barcode', 'RequestedDate', 'Nil_ReceivedResult', 'TB1_ReceivedResult', 'TB2_ReceivedResult', 'Mitogeno_ReceivedResult', 'DifferenceTB1_Nil', 'DifferenceTB2_Nil', 'DifferenceMitogen_Nil', 'Quantiferon_Result']
-                missing_cols = [col for col in required_cols if col not in df.columns]
+                text_cols = [col for col in required_cols if col != 'RequestedDate'] # String columns to clean
+                file_chunks = [] # Processed chunks of this file
+                missing_cols = []
+
+                # Read the file in chunks so large LQS dumps are never fully buffered twice
+                for df in read_file_chunks(filename):
+                    # Skip empty chunks (e.g. header-only files)
+                    if df.empty:
+                        continue
+
+                    # --- Data Validation/Cleaning ---
+                    if DEBUG and not file_chunks:
+                        print(f"Columns found: {list(df.columns)}")
+                    missing_cols = [col for col in required_cols if col not in df.columns]
+                    if missing_cols:
+                         # Try alternate spelling Mitogen vs Mitogeno
+                         if 'Mitogen_ReceivedResult' in df.columns and 'Mitogeno_ReceivedResult' in missing_cols:
+                              df.rename(columns={'Mitogen_ReceivedResult':'Mitogeno_ReceivedResult'}, inplace=True)
+                              missing_cols.remove('Mitogeno_ReceivedResult')
+                              if DEBUG: print("Info: Renamed 'Mitogen_ReceivedResult' to 'Mitogeno_ReceivedResult'.")
+                         if 'DifferenceMitogen_Nil' not in df.columns and 'DifferenceMitogeno_Nil' in df.columns:
+                             df.rename(columns={'DifferenceMitogeno_Nil': 'DifferenceMitogen_Nil'}, inplace=True)
+                             missing_cols.remove('DifferenceMitogen_Nil')
+                             if DEBUG: print("Info: Renamed 'DifferenceMitogeno_Nil' to 'DifferenceMitogen_Nil'.")
+
+                         # Recheck missing after potential renames
+                         missing_cols = [col for col in required_cols if col not in df.columns]
+                         if missing_cols:
+                             break # Every chunk shares the header, no point reading further
+
+                    if DEBUG and not file_chunks:
+                        print(f"First 5 rows (before date conversion):\n{df.head().to_string()}")
+
+                    # Clean only the columns we keep (already str via dtype=str/keep_default_na=False)
+                    df[text_cols] = df[text_cols].apply(lambda col: col.str.strip().replace('', ' '))
+
+                    # Keep only the columns we use so the concat below copies as little as possible
+                    file_chunks.append(df[required_cols])
+
                 if missing_cols:
-                     # Try alternate spelling Mitogen vs Mitogeno
-                     if 'Mitogen_ReceivedResult' in df.columns and 'Mitogeno_ReceivedResult' in missing_cols:
-                          df.rename(columns={'Mitogen_ReceivedResult':'Mitogeno_ReceivedResult'}, inplace=True)
-                          missing_cols.remove('Mitogeno_ReceivedResult')
-                          print("Info: Renamed 'Mitogen_ReceivedResult' to 'Mitogeno_ReceivedResult'.")
-                     if 'DifferenceMitogen_Nil' not in df.columns and 'DifferenceMitogeno_Nil' in df.columns:
-                         df.rename(columns={'DifferenceMitogeno_Nil': 'DifferenceMitogen_Nil'}, inplace=True)
-                         missing_cols.remove('DifferenceMitogen_Nil')
-                         print("Info: Renamed 'DifferenceMitogeno_Nil' to 'DifferenceMitogen_Nil'.")
-
-                     # Recheck missing after potential renames
-                     missing_cols = [col for col in required_cols if col not in df.columns]
-                     if missing_cols:
-                         print(f"Skipping {os.path.basename(filename)}: Missing required columns: {missing_cols}")
-                         error_files.append(f"{os.path.basename(filename)} (Missing Columns: {', '.join(missing_cols)})")
-                         continue
-
-                print(f"First 5 rows (before date conversion):\n{df.head().to_string()}")
-
-                # Convert 'RequestedDate' using Script 2's format
-                df['RequestedDate_original'] = df['RequestedDate'] # Keep original for debugging
-                df['RequestedDate'] = pd.to_datetime(df['RequestedDate'], format='%d/%m/%Y %H:%M:%S', errors='coerce')
-                print(f"Date conversion results (first 5):\n{df[['RequestedDate_original', 'RequestedDate']].head().to_string()}")
-                invalid_date_count = df['RequestedDate'].isna().sum()
-                if invalid_date_count > 0:
-                     print(f"Warning: {invalid_date_count} rows had invalid dates (set to NaT).")
-                     # Keep rows with invalid dates for now, handle later or let user know.
+                    print(f"Skipping {os.path.basename(filename)}: Missing required columns: {missing_cols}")
+                    error_files.append(f"{os.path.basename(filename)} (Missing Columns: {', '.join(missing_cols)})")
+                    continue
 
-                # Clean string columns (like Script 1)
-                for col in df.columns:
-                   if df[col].dtype == 'object': # Only process string columns
-                       df[col] = df[col].fillna(" ").astype(str).str.strip()
-                       df[col] = df[col].replace('', ' ')
+                # Check if nothing was read from the file
+                if not file_chunks:
+                    print(f"Skipping {os.path.basename(filename)}: File is empty or could not be read properly.")
+                    error_files.append(f"{os.path.basename(filename)} (Empty or Read Issue)")
+                    continue
 
-                imported_df_list.append(df) # Add processed df to list
+                imported_df_list.extend(file_chunks) # Add processed chunks to list
                 success_count += 1
-                print(f"Processed {os.path.basename(filename)}. Shape: {df.shape}")
+                if DEBUG: print(f"Processed {os.path.basename(filename)}. Rows: {sum(len(chunk) for chunk in file_chunks)}")
 
             except Exception as e:
                 print(f"Error processing file {filename}: {str(e)}") # Debug print
@@ -521,10 +743,22 @@ def import_data(add_mode=False):
 
         # --- After the loop ---
         if imported_df_list:
-            imported_df = pd.concat(imported_df_list, ignore_index=True)
-            print(f"\n--- Final Processing ---")
-            print(f"Total combined shape: {imported_df.shape}")
-            print(f"Final columns: {list(imported_df.columns)}")
+            # A single chunk needs no concat copy
+            if len(imported_df_list) == 1:
+                imported_df = imported_df_list[0].reset_index(drop=True)
+            else:
+                imported_df = pd.concat(imported_df_list, ignore_index=True)
+
+            # Convert 'RequestedDate' using Script 2's format, once for all files.
+            # cache=True parses each distinct date string only once (samples from one run share dates)
+            imported_df['RequestedDate'] = pd.to_datetime(imported_df['RequestedDate'], format=_IMPORT_DATE_FORMAT, errors='coerce', cache=True)
+            if DEBUG:
+                invalid_date_count = imported_df['RequestedDate'].isna().sum()
+                if invalid_date_count > 0:
+                     print(f"Warning: {invalid_date_count} rows had invalid dates (set to NaT).")
+                     # Keep rows with invalid dates for now, handle later or let user know.
+                print(f"Total combined shape: {imported_df.shape}")
+                print(f"Final columns: {list(imported_df.columns)}")
 
             # Rename columns to match the expected internal names ('results' table names in DB)
             # Use Script 1's mapping
@@ -544,34 +778,35 @@ def import_data(add_mode=False):
             cols_to_keep_and_rename = {k: v for k, v in rename_map.items() if k in imported_df.columns}
             imported_df = imported_df[list(cols_to_keep_and_rename.keys())].rename(columns=cols_to_keep_and_rename)
 
-            print(f"Columns after rename & selection: {list(imported_df.columns)}")
-            print(f"Final imported_df head:\n{imported_df.head().to_string()}")
-
-            data_to_set_or_add = imported_df.to_dict('records') # Convert DF to list of dictionaries
+            if DEBUG:
+                print(f"Columns after rename & selection: {list(imported_df.columns)}")
+                print(f"Final imported_df head:\n{imported_df.head().to_string()}")
 
             if add_mode:
-                # Get existing barcodes to avoid duplicates
-                existing_barcodes = set(main_app.get_all_barcodes())
-                # Filter new data
-                new_rows = [row for row in data_to_set_or_add if str(row.get('barcode','')) not in existing_barcodes]
-
-                if not new_rows:
+                # Filter out barcodes already loaded, on the DataFrame (no per-row dict scan).
+                # Done here rather than with a UNIQUE(session_id, barcode) + INSERT OR IGNORE in the DB:
+                # data is only written at save time, and a session may legitimately hold a barcode twice.
+                # Barcode column is already str from the import cleaning, so no astype copy is needed.
+                existing_barcodes = main_app.get_all_barcodes()
+                new_df = imported_df[~imported_df['barcode'].isin(existing_barcodes)]
+
+                if new_df.empty:
                     messagebox.showinfo("Add Data", "No new unique records found in the selected file(s).", parent=main_app.master)
                     main_app.update_status("Add data complete (no new records).", hide_progress=True)
                     return # Exit if no new data
                 else:
-                    print(f"Adding {len(new_rows)} new rows.")
-                    main_app.add_data_rows(new_rows) # Add the new rows
-                    message = f"{len(new_rows)} new unique record(s) added."
+                    if DEBUG: print(f"Adding {len(new_df)} new rows.")
+                    main_app.add_dataframe(new_df) # Add the new rows
+                    message = f"{len(new_df)} new unique record(s) added."
             else: # Replace mode
-                print(f"Setting {len(data_to_set_or_add)} rows.")
-                main_app.set_data_rows(data_to_set_or_add) # Use the list of dicts
+                if DEBUG: print(f"Setting {len(imported_df)} rows.")
+                main_app.set_dataframe(imported_df) # Build rows straight from the DataFrame
                  # Update imported filename source tracking
                 if len(filenames) == 1:
                     main_app.imported_filename_source = os.path.splitext(os.path.basename(filenames[0]))[0] # Base name like Script 2
                 else:
                     main_app.imported_filename_source = f"Combined_Data_{len(filenames)}_files" # Like Script 2
-                message = f"{len(data_to_set_or_add)} record(s) imported."
+                message = f"{len(imported_df)} record(s) imported."
 
             # Display message after data is processed
             if error_files:
@@ -584,7 +819,7 @@ def import_data(add_mode=False):
             main_app.update_status("Import complete.", hide_progress=True)
 
         else: # If imported_df_list is empty after loop
-             print("\n--- No Data Imported ---")
+             if DEBUG: print("\n--- No Data Imported ---")
              message = "No valid data could be imported."
              if error_files:
                  message += "\nErrors occurred in:\n" + "\n".join(error_files)
@@ -610,24 +845,15 @@ def show_export_options():
     # Adjust size for better layout with descriptions
     dialog_width = 350
     dialog_height = 500 # Increased height
-    export_window.geometry(f"{dialog_width}x{dialog_height}")
     export_window.resizable(False, False)
-    export_window.transient(main_app.master)
-    export_window.grab_set()
     # Use the main app's background color
     export_window.configure(bg='#f0f2f5')
 
-    # Center the dialog
-    main_app.center_window(export_window, dialog_width, dialog_height)
-
     # Main frame using the app's background style
     main_frame = ttk.Frame(export_window, style='TFrame', padding=(20, 15))
     main_frame.pack(fill=tk.BOTH, expand=True)
 
-    # Title using main app's Title style (or similar)
-    # Adjust font size slightly smaller for a dialog
-    main_app.style.configure('DialogHeader.TLabel', font=('Open Sans', 16, 'bold'),
-                             foreground='#1976D2', background='#f0f2f5')
+    # Title using the dialog header style (configured once in setup_styles)
     title_label = ttk.Label(main_frame, text="Export Options", style='DialogHeader.TLabel', anchor='center')
     title_label.pack(pady=(0, 5))
 
@@ -646,10 +872,6 @@ def show_export_options():
         {'text': "📝 CSV File",   'desc': "Plain text, comma-separated", 'command': export_to_csv}
     ]
 
-    # Define a slightly smaller description style if needed
-    main_app.style.configure('DialogDesc.TLabel', font=('Open Sans', 9),
-                             foreground='#666666', background='#f0f2f5')
-
     for option in export_options:
         # Create a frame for each button + description pair
         option_sub_frame = ttk.Frame(options_frame, style='TFrame')
@@ -686,12 +908,29 @@ def show_export_options():
     )
     cancel_button.pack(pady=(5, 10))
 
+    # Size/center and grab only once the widgets exist, so the window manager round-trip happens once
+    main_app.center_window(export_window, dialog_width, dialog_height)
+    export_window.transient(main_app.master)
+    export_window.grab_set()
+
 
 # --- Export Functions (Combine Script 1's structure with Script 2's formatting) ---
 
+def open_file_with_default_app(filename):
+    """Opens an exported file with the platform's default application (no shell involved)."""
+    system = platform.system()
+    if system == 'Windows':
+        os.startfile(filename)
+    else:
+        subprocess.Popen(['open' if system == 'Darwin' else 'xdg-open', filename], close_fds=True)
+
 # Helper for color conversion (needed for PDF)
+# Only a handful of distinct colors are ever used, so cache the Color objects
+@functools.lru_cache(maxsize=64)
 def hex_to_color(hex_color):
     """Converts hex color string to ReportLab Color object."""
+    from reportlab.lib import colors as reportlab_colors
+    from reportlab.lib.colors import Color # Needed for custom RGB colors in PDF
     if not hex_color or not hex_color.startswith('#'): return reportlab_colors.black # Default
     hex_color = hex_color.lstrip('#')
     try:
@@ -703,9 +942,85 @@ def hex_to_color(hex_color):
     except:
         return reportlab_colors.black # Fallback
 
+_PdfStyles = namedtuple('_PdfStyles', [
+    'normal', 'title', 'date', 'header', 'cell', 'comment', 'qft_pos', 'qft_neg', 'qft_ind',
+    'summary_title', 'summary_date', 'summary_header', 'summary_cell', 'signature',
+    'summary_pos', 'summary_wp', 'summary_neg', 'summary_ind'])
+
+@functools.lru_cache(maxsize=8)
+def _pdf_report_styles(pos_text, neg_text, ind_text, wp_text):
+    """Builds the ParagraphStyles for the PDF report (cached per set of text colors)."""
+    from reportlab.lib import colors as reportlab_colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    styles = getSampleStyleSheet()
+    cell_style = ParagraphStyle('TableCell', parent=styles['Normal'], fontSize=9, alignment=1)
+    summary_cell_style = ParagraphStyle('SummaryCell', parent=styles['Normal'], fontSize=10, alignment=1)
+    return _PdfStyles(
+        normal=styles['Normal'],
+        title=ParagraphStyle('ReportTitle', parent=styles['Heading1'], fontSize=24, alignment=1, spaceAfter=6),
+        date=ParagraphStyle('ReportDate', parent=styles['Normal'], fontSize=12, alignment=1, spaceAfter=12),
+        header=ParagraphStyle('TableHeader', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=11, alignment=1),
+        cell=cell_style,
+        comment=ParagraphStyle('CommentCell', parent=styles['Normal'], fontSize=9, alignment=1, textColor=reportlab_colors.grey),
+        # QFT result styles with text colors
+        qft_pos=ParagraphStyle('QFT_POS', parent=cell_style, textColor=hex_to_color(pos_text)),
+        qft_neg=ParagraphStyle('QFT_NEG', parent=cell_style, textColor=hex_to_color(neg_text)),
+        qft_ind=ParagraphStyle('QFT_IND', parent=cell_style, textColor=hex_to_color(ind_text)),
+        summary_title=ParagraphStyle('SummaryTitle', parent=styles['h2'], fontSize=14, alignment=1, spaceBefore=20, spaceAfter=10),
+        summary_date=ParagraphStyle('SummaryStyle', parent=styles['Normal'], fontSize=12, spaceAfter=5, alignment=1),
+        summary_header=ParagraphStyle('SummaryHeader', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=10, alignment=1),
+        summary_cell=summary_cell_style,
+        signature=ParagraphStyle('Signature', parent=styles['Normal'], fontSize=10, alignment=0, spaceBefore=20),
+        # Summary cell styles with text colors
+        summary_pos=ParagraphStyle('SummaryPOS', parent=summary_cell_style, textColor=hex_to_color(pos_text)),
+        summary_wp=ParagraphStyle('SummaryWP', parent=summary_cell_style, textColor=hex_to_color(wp_text)),
+        summary_neg=ParagraphStyle('SummaryNEG', parent=summary_cell_style, textColor=hex_to_color(neg_text)),
+        summary_ind=ParagraphStyle('SummaryIND', parent=summary_cell_style, textColor=hex_to_color(ind_text)),
+    )
+
+@functools.lru_cache(maxsize=None)
+def _row_table_doc_class():
+    """Returns the document class shared by both PDF exports (defined on first use, as reportlab loads lazily)."""
+    from reportlab.platypus import BaseDocTemplate, ActionFlowable
+
+    class RowTableDocTemplate(BaseDocTemplate):
+        """BaseDocTemplate that creates the data row tables block by block while the document is built.
+
+        Splitting a table costs time proportional to the rows left in it, so the rows go into
+        back-to-back tables of rows_per_table rows instead of one huge table. Each 'feedRows'
+        action puts the next table (and the action for the block after it) at the front of the
+        remaining story, so only the block being laid out is held in memory.
+        """
+
+        def row_tables(self, make_row_table, total_rows, rows_per_table):
+            """Returns the story placeholder for the row tables; make_row_table(start) builds one block."""
+            self.make_row_table = make_row_table
+            self.total_rows = total_rows
+            self.rows_per_table = rows_per_table
+            return ActionFlowable(('feedRows', 0))
+
+        def build(self, flowables, *args, **kwargs):
+            self._remaining_story = flowables # The list build() consumes, handle_feedRows inserts into it
+            super().build(flowables, *args, **kwargs)
+
+        def handle_feedRows(self, start):
+            """Inserts the table for rows start..start+rows_per_table at the front of the remaining story."""
+            next_start = start + self.rows_per_table
+            flowables = [self.make_row_table(start)]
+            if next_start < self.total_rows:
+                flowables.append(ActionFlowable(('feedRows', next_start)))
+            self._remaining_story[0:0] = flowables
+
+    return RowTableDocTemplate
+
 def export_to_pdf():
     """Exports the current data view to a formatted PDF file (Script 2 Formatting)."""
     global main_app, app_settings # Need app_settings here
+    # reportlab is imported lazily so app startup doesn't pay for it
+    from reportlab.lib import colors as reportlab_colors # Renamed to avoid clash
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.platypus import (PageTemplate, Frame, NextPageTemplate,
+                                    Paragraph, Spacer, Table, LongTable, TableStyle, PageBreak)
     if not main_app.has_data():
         messagebox.showwarning("Export PDF", "No data available to export.")
         return
@@ -729,36 +1044,29 @@ def export_to_pdf():
     main_app.update_status("Exporting to PDF...", show_progress=True)
 
     try:
-        doc = SimpleDocTemplate(filename, pagesize=landscape(letter),
-                                rightMargin=30, leftMargin=30, topMargin=20, bottomMargin=20)
-        styles = getSampleStyleSheet()
+        doc = _row_table_doc_class()(filename, pagesize=landscape(letter),
+                                     rightMargin=30, leftMargin=30, topMargin=20, bottomMargin=20)
         story = []
 
         # --- Color Settings (Load from app_settings) ---
         current_colors = app_settings # Use the global settings directly
 
-        # --- PDF Styles (Define styles including text colors) ---
-        title_style = ParagraphStyle('ReportTitle', parent=styles['Heading1'], fontSize=24, alignment=1, spaceAfter=6)
-        date_style = ParagraphStyle('ReportDate', parent=styles['Normal'], fontSize=12, alignment=1, spaceAfter=12)
-        header_style = ParagraphStyle('TableHeader', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=11, alignment=1)
-        cell_style = ParagraphStyle('TableCell', parent=styles['Normal'], fontSize=9, alignment=1)
-        comment_style = ParagraphStyle('CommentCell', parent=styles['Normal'], fontSize=9, alignment=1, textColor=reportlab_colors.grey)
-
-        # *** NEW: Define QFT result styles with text colors ***
-        qft_pos_style = ParagraphStyle('QFT_POS', parent=cell_style, textColor=hex_to_color(current_colors['pos_text']))
-        qft_neg_style = ParagraphStyle('QFT_NEG', parent=cell_style, textColor=hex_to_color(current_colors['neg_text']))
-        qft_ind_style = ParagraphStyle('QFT_IND', parent=cell_style, textColor=hex_to_color(current_colors['ind_text']))
-
-        summary_title_style = ParagraphStyle('SummaryTitle', parent=styles['h2'], fontSize=14, alignment=1, spaceBefore=20, spaceAfter=10)
-        summary_header_style = ParagraphStyle('SummaryHeader', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=10, alignment=1)
-        summary_cell_style = ParagraphStyle('SummaryCell', parent=styles['Normal'], fontSize=10, alignment=1)
-        signature_style = ParagraphStyle('Signature', parent=styles['Normal'], fontSize=10, alignment=0, spaceBefore=20)
-
-        # *** NEW: Define summary cell styles with text colors ***
-        summary_pos_style = ParagraphStyle('SummaryPOS', parent=summary_cell_style, textColor=hex_to_color(current_colors['pos_text']))
-        summary_wp_style = ParagraphStyle('SummaryWP', parent=summary_cell_style, textColor=hex_to_color(current_colors['ind_text'])) # Use IND color for WP
-        summary_neg_style = ParagraphStyle('SummaryNEG', parent=summary_cell_style, textColor=hex_to_color(current_colors['neg_text']))
-        summary_ind_style = ParagraphStyle('SummaryIND', parent=summary_cell_style, textColor=hex_to_color(current_colors['ind_text']))
+        # --- PDF Styles (cached; only rebuilt when the text colors change) ---
+        pdf_styles = _pdf_report_styles(current_colors['pos_text'], current_colors['neg_text'],
+                                        current_colors['ind_text'], current_colors['wp_text'])
+        normal_style = pdf_styles.normal
+        title_style = pdf_styles.title
+        date_style = pdf_styles.date
+        header_style = pdf_styles.header
+        cell_style = pdf_styles.cell
+        comment_style = pdf_styles.comment
+        qft_pos_style = pdf_styles.qft_pos
+        qft_neg_style = pdf_styles.qft_neg
+        qft_ind_style = pdf_styles.qft_ind
+        summary_title_style = pdf_styles.summary_title
+        summary_header_style = pdf_styles.summary_header
+        summary_cell_style = pdf_styles.summary_cell
+        signature_style = pdf_styles.signature
 
 
         # PDF Header (Like Script 2)
@@ -767,31 +1075,33 @@ def export_to_pdf():
         img_width = 150 # From S2
         img_height = 90 # From S2
         # Left Logo
-        if LEFT_LOGO_PATH and os.path.exists(LEFT_LOGO_PATH):
+        left_logo_path = _get_logo(DEFAULT_LEFT_LOGO)
+        if left_logo_path:
             try:
-                 left_img = Image(LEFT_LOGO_PATH, width=img_width, height=img_height)
+                 left_img = _logo_image(left_logo_path, img_width, img_height) # Decoded once per session
                  left_img.hAlign = 'LEFT'
                  header_content.append(left_img)
             except Exception as img_err:
                  print(f"Error loading left logo: {img_err}")
-                 header_content.append(Paragraph(" ", styles['Normal'])) # Placeholder
+                 header_content.append(Paragraph(" ", normal_style)) # Placeholder
         else:
-            header_content.append(Paragraph(" ", styles['Normal']))
+            header_content.append(Paragraph(" ", normal_style))
 
         # Title (Use S2's text)
         header_content.append(Paragraph("LIASION® QuantiFERON®", title_style)) # Title from S2
 
         # Right Logo
-        if RIGHT_LOGO_PATH and os.path.exists(RIGHT_LOGO_PATH):
+        right_logo_path = _get_logo(DEFAULT_RIGHT_LOGO)
+        if right_logo_path:
             try:
-                right_img = Image(RIGHT_LOGO_PATH, width=img_width, height=img_height)
+                right_img = _logo_image(right_logo_path, img_width, img_height) # Decoded once per session
                 right_img.hAlign = 'RIGHT'
                 header_content.append(right_img)
             except Exception as img_err:
                  print(f"Error loading right logo: {img_err}")
-                 header_content.append(Paragraph(" ", styles['Normal']))
+                 header_content.append(Paragraph(" ", normal_style))
         else:
-            header_content.append(Paragraph(" ", styles['Normal']))
+            header_content.append(Paragraph(" ", normal_style))
 
         # Header table layout from S2
         header_table = Table([header_content], colWidths=[img_width, 450, img_width]) # Widths from S2
@@ -803,99 +1113,123 @@ def export_to_pdf():
 
         report_date_str = main_app.get_report_date_str()
         all_results_for_summary = data_to_export
+        # Comments and QFT results feed both the table and the summary, so work them out once
+        comments = list(map(calculate_comment, data_to_export))
+        qft_results = [str(row_dict.get('qft_result', ' ')).upper() for row_dict in data_to_export]
         table_headers_s2 = ['No.', 'Barcode', 'Nil_Result', 'TB1_Result', 'TB2_Result',
                             'Mit_Result', 'TB1_Nil', 'TB2_Nil', 'Mit_Nil', 'QFT_Result', 'Comment']
         col_widths_s2 = [30, 80, 60, 70, 70, 70, 60, 60, 60, 70, 80]
 
-        ROWS_PER_PAGE = 21
-        for i in range(0, len(all_results_for_summary), ROWS_PER_PAGE):
-            story.append(header_table)
-            story.append(Paragraph(f"Report Date: {report_date_str}", date_style))
-            story.append(Spacer(1, 10))
+        # --- PDF Table Styling (Apply BG color, remove TEXTCOLOR) ---
+        cell_commands = [
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 1, reportlab_colors.black),
+            # Cell padding
+            ('TOPPADDING', (0, 0), (-1, -1), 4), ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('LEFTPADDING', (0, 0), (-1, -1), 3), ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+        ]
+        column_header_table = Table([[Paragraph(h, header_style) for h in table_headers_s2]], colWidths=col_widths_s2)
+        column_header_table.setStyle(TableStyle(cell_commands + [
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('LINEBELOW', (0, 0), (-1, 0), 2, reportlab_colors.black),
+            # Header backgrounds
+            ('BACKGROUND', (2, 0), (2, 0), reportlab_colors.Color(0.85, 0.85, 0.85)),
+            ('BACKGROUND', (3, 0), (3, 0), reportlab_colors.Color(0.7, 0.9, 0.7)),
+            ('BACKGROUND', (4, 0), (4, 0), reportlab_colors.Color(1.0, 0.95, 0.7)),
+            ('BACKGROUND', (5, 0), (5, 0), reportlab_colors.Color(0.85, 0.7, 0.9)),
+            ('BACKGROUND', (9, 0), (9, 0), reportlab_colors.Color(0.529, 0.808, 0.922)),
+        ]))
 
-            page_data_rows = all_results_for_summary[i : i + ROWS_PER_PAGE]
+        # --- Page templates ---
+        # The logo/title/date header and the table's column header row are built once and drawn
+        # by the page callback on every data page, instead of being added to the story per page.
+        page_header = [header_table,
+                       Paragraph(f"Report Date: {report_date_str}", date_style),
+                       Spacer(1, 10),
+                       column_header_table]
+        header_height = 6 # Frame top padding, same as the old single-frame layout
+        for flowable in page_header:
+            header_height += flowable.wrap(doc.width, doc.height)[1] + flowable.getSpaceAfter()
+
+        def draw_page_header(canvas, doc):
+            """Draws the shared report header at the top of a data page."""
+            header_frame = Frame(doc.leftMargin, doc.bottomMargin + doc.height - header_height,
+                                 doc.width, header_height, bottomPadding=0, showBoundary=0)
+            header_frame.addFromList(list(page_header), canvas)
+
+        body_frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height - header_height,
+                           topPadding=0, id='body')
+        full_frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='full')
+        doc.addPageTemplates([
+            PageTemplate(id='Report', frames=[body_frame], onPage=draw_page_header),
+            PageTemplate(id='Summary', frames=[full_frame]), # Summary page has no report header
+        ])
+
+        # Hoist per-row lookups out of the table loop
+        decimals = app_settings['decimal_places']
+        fmt = format_number_with_decimals
+        num_values = _num_values
+        qft_style_map = {'POS': qft_pos_style, 'POS*': qft_pos_style, 'NEG': qft_neg_style, 'IND': qft_ind_style}
+
+        # Result values, QFT results and comments repeat a lot, so each distinct (text, style)
+        # Paragraph is parsed once and shared between cells. This is safe inside a table because
+        # every cell is re-wrapped to its own column width right before it is drawn.
+        paragraph_cache = {}
+        def P(text, style):
+            key = (text, style)
+            para = paragraph_cache.get(key)
+            if para is None:
+                para = paragraph_cache[key] = Paragraph(text, style)
+            return para
+
+        pos_bg_color = hex_to_color(current_colors['pos_bg'])
+        neg_bg_color = hex_to_color(current_colors['neg_bg'])
+        ind_bg_color = hex_to_color(current_colors['ind_bg'])
+        row_bg_map = {'POS': pos_bg_color, 'POS*': pos_bg_color, 'NEG': neg_bg_color, 'IND': ind_bg_color}
+
+        # Data rows go into back-to-back LongTables of ROWS_PER_TABLE rows that ReportLab splits
+        # across pages (see _row_table_doc_class)
+        ROWS_PER_TABLE = 50
+        total_rows = len(all_results_for_summary)
+
+        def make_row_table(start):
+            """Builds the LongTable for rows start..start+ROWS_PER_TABLE."""
             table_data = []
-            table_data.append([Paragraph(h, header_style) for h in table_headers_s2])
-
-            for row_num_rel, row_dict in enumerate(page_data_rows, 1):
-                row_num_abs = i + row_num_rel
-                nil_disp = format_number_with_decimals(row_dict.get('nil_result', ' '), app_settings['decimal_places'])
-                tb1_disp = format_number_with_decimals(row_dict.get('tb1_result', ' '), app_settings['decimal_places'])
-                tb2_disp = format_number_with_decimals(row_dict.get('tb2_result', ' '), app_settings['decimal_places'])
-                mit_disp = format_number_with_decimals(row_dict.get('mit_result', ' '), app_settings['decimal_places'])
-                tb1_nil_disp = format_number_with_decimals(row_dict.get('tb1_nil', ' '), app_settings['decimal_places'])
-                tb2_nil_disp = format_number_with_decimals(row_dict.get('tb2_nil', ' '), app_settings['decimal_places'])
-                mit_nil_disp = format_number_with_decimals(row_dict.get('mit_nil', ' '), app_settings['decimal_places'])
-                qft_result = str(row_dict.get('qft_result', ' ')).upper()
-                comment = calculate_comment(row_dict)
-
-                # *** Select the appropriate QFT style ***
-                current_qft_style = cell_style # Default
-                if qft_result in ('POS', 'POS*'): current_qft_style = qft_pos_style
-                elif qft_result == 'NEG': current_qft_style = qft_neg_style
-                elif qft_result == 'IND': current_qft_style = qft_ind_style
-
-                row_values = [
-                    Paragraph(str(row_num_abs), cell_style),
-                    Paragraph(str(row_dict.get('barcode', ' ')), cell_style),
-                    Paragraph(nil_disp, cell_style), Paragraph(tb1_disp, cell_style),
-                    Paragraph(tb2_disp, cell_style), Paragraph(mit_disp, cell_style),
-                    Paragraph(tb1_nil_disp, cell_style), Paragraph(tb2_nil_disp, cell_style),
-                    Paragraph(mit_nil_disp, cell_style),
-                    Paragraph(qft_result, current_qft_style), # *** Use the selected style ***
-                    Paragraph(comment, comment_style)
-                ]
+            table_style_commands = list(cell_commands)
+            end = start + ROWS_PER_TABLE
+            block = zip(all_results_for_summary[start:end], qft_results[start:end], comments[start:end])
+            for r_idx, (row_dict, qft_result, comment) in enumerate(block):
+
+                # *** Select the appropriate QFT style (default cell style) ***
+                current_qft_style = qft_style_map.get(qft_result, cell_style)
+
+                # Row number and barcode are unique per row, so they skip the shared Paragraph cache
+                row_values = [Paragraph(str(start + r_idx + 1), cell_style), Paragraph(str(row_dict.get('barcode', ' ')), cell_style)]
+                row_values.extend([P(fmt(value, decimals), cell_style) for value in num_values(row_dict)])
+                row_values.append(P(qft_result, current_qft_style)) # *** Use the selected style ***
+                row_values.append(P(comment, comment_style))
                 table_data.append(row_values)
 
-            data_table = Table(table_data, colWidths=col_widths_s2, repeatRows=1)
-
-            # --- PDF Table Styling (Apply BG color, remove TEXTCOLOR) ---
-            table_style_commands = [
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('GRID', (0, 0), (-1, -1), 1, reportlab_colors.black),
-                ('LINEBELOW', (0, 0), (-1, 0), 2, reportlab_colors.black),
-                # Header backgrounds
-                ('BACKGROUND', (2, 0), (2, 0), reportlab_colors.Color(0.85, 0.85, 0.85)),
-                ('BACKGROUND', (3, 0), (3, 0), reportlab_colors.Color(0.7, 0.9, 0.7)),
-                ('BACKGROUND', (4, 0), (4, 0), reportlab_colors.Color(1.0, 0.95, 0.7)),
-                ('BACKGROUND', (5, 0), (5, 0), reportlab_colors.Color(0.85, 0.7, 0.9)),
-                ('BACKGROUND', (9, 0), (9, 0), reportlab_colors.Color(0.529, 0.808, 0.922)),
-                # Cell padding
-                ('TOPPADDING', (0, 0), (-1, -1), 4), ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-                ('LEFTPADDING', (0, 0), (-1, -1), 3), ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-            ]
-
-            # Apply row-specific background colors ONLY
-            for r_idx, row_dict in enumerate(page_data_rows, 1):
-                qft_result = str(row_dict.get('qft_result', '')).upper()
-                row_bg_color = None
-
-                if qft_result in ('POS', 'POS*'):
-                    row_bg_color = hex_to_color(current_colors['pos_bg'])
-                elif qft_result == 'NEG':
-                    row_bg_color = hex_to_color(current_colors['neg_bg'])
-                elif qft_result == 'IND':
-                    row_bg_color = hex_to_color(current_colors['ind_bg'])
-
+                # Apply row-specific background colors ONLY (text color handled by ParagraphStyle)
+                row_bg_color = row_bg_map.get(qft_result)
                 if row_bg_color:
                     table_style_commands.append(('BACKGROUND', (0, r_idx), (-1, r_idx), row_bg_color))
-                # *** REMOVED TEXTCOLOR command here - handled by ParagraphStyle ***
 
+            data_table = LongTable(table_data, colWidths=col_widths_s2)
             data_table.setStyle(TableStyle(table_style_commands))
-            story.append(data_table)
+            return data_table
 
-            if i + ROWS_PER_PAGE < len(all_results_for_summary):
-                story.append(PageBreak())
+        # The tables are created block by block while the document is being built
+        story.append(doc.row_tables(make_row_table, total_rows, ROWS_PER_TABLE))
 
 
         # --- PDF Summary Page (Apply colored Paragraph styles) ---
+        story.append(NextPageTemplate('Summary'))
         story.append(PageBreak())
-        summary_style_s2 = ParagraphStyle('SummaryStyle', parent=styles['Normal'], fontSize=12, spaceAfter=5, alignment=1)
         story.append(Paragraph("Summary Report", summary_title_style))
-        story.append(Paragraph(f"Summary Date: {report_date_str}", summary_style_s2))
+        story.append(Paragraph(f"Summary Date: {report_date_str}", pdf_styles.summary_date))
         story.append(Spacer(1, 20))
 
         # Calculate summary stats (remains the same)
@@ -913,9 +1247,8 @@ def export_to_pdf():
         high_nil_count = 0
         low_mit_count = 0
 
-        for res in all_results_for_summary:
-            qft = str(res.get('qft_result', '')).upper()
-            comment = calculate_comment(res)
+        to_float = _to_float # Local alias for the summary pass
+        for res, qft, comment in zip(all_results_for_summary, qft_results, comments):
 
             if qft in ('POS', 'POS*'):
                 is_wp = 'WP' in comment
@@ -926,17 +1259,14 @@ def export_to_pdf():
                     elif 'TB2' in comment: wp_tb2_only += 1
                 else: # Strong Positive Check
                      try:
-                          tb1_nil_str = str(res.get('tb1_nil', '0')).replace('>', '').replace('<', '').strip()
-                          tb1_nil = float(tb1_nil_str) if tb1_nil_str and tb1_nil_str != ' ' else 0.0
-                          tb2_nil_str = str(res.get('tb2_nil', '0')).replace('>', '').replace('<', '').strip()
-                          tb2_nil = float(tb2_nil_str) if tb2_nil_str and tb2_nil_str != ' ' else 0.0
+                          tb1_strong = to_float(res.get('tb1_nil', '0')) >= 1.0
+                          tb2_strong = to_float(res.get('tb2_nil', '0')) >= 1.0
 
-                          is_strong = tb1_nil >= 1.0 or tb2_nil >= 1.0
-                          if is_strong:
+                          if tb1_strong or tb2_strong:
                               positive_results_count += 1 # Count strong positives
-                              if tb1_nil >= 1.0 and tb2_nil >= 1.0: both_tb_strong += 1
-                              elif tb1_nil >= 1.0: tb1_strong_only += 1
-                              elif tb2_nil >= 1.0: tb2_strong_only += 1
+                              if tb1_strong and tb2_strong: both_tb_strong += 1
+                              elif tb1_strong: tb1_strong_only += 1
+                              else: tb2_strong_only += 1
                      except ValueError:
                           pass # Ignore if values aren't numeric
 
@@ -946,12 +1276,12 @@ def export_to_pdf():
                 indeterminate_results_count += 1
                 if 'High Nil' in comment: high_nil_count += 1
                 elif 'Low Mit' in comment: low_mit_count += 1
-        
-        summary_pos_style = ParagraphStyle('SummaryPOS', parent=summary_cell_style, textColor=hex_to_color(current_colors['pos_text']))
-        summary_wp_style = ParagraphStyle('SummaryWP', parent=summary_cell_style, textColor=hex_to_color(current_colors['wp_text'])) # Use WP text color
-        summary_neg_style = ParagraphStyle('SummaryNEG', parent=summary_cell_style, textColor=hex_to_color(current_colors['neg_text']))
-        summary_ind_style = ParagraphStyle('SummaryIND', parent=summary_cell_style, textColor=hex_to_color(current_colors['ind_text']))
-        
+
+        summary_pos_style = pdf_styles.summary_pos
+        summary_wp_style = pdf_styles.summary_wp # Uses WP text color
+        summary_neg_style = pdf_styles.summary_neg
+        summary_ind_style = pdf_styles.summary_ind
+
         # Use helper P function with specific colored styles for data row
         def P_header(text): return Paragraph(str(text), summary_header_style)
         def P_data(text): return Paragraph(str(text), summary_cell_style)
@@ -969,7 +1299,7 @@ def export_to_pdf():
              P_wp(wp_total_count), P_wp(wp_tb1_only), P_wp(wp_tb2_only), P_wp(wp_both), # Use P_wp helper
              P_neg(negative_results_count),
              P_ind(indeterminate_results_count), P_ind(high_nil_count), P_ind(low_mit_count)],
-            [Paragraph('', styles['Normal']), '', '', '', '', '', '', '', '', '', '', '', ''], # Empty row
+            [Paragraph('', normal_style), '', '', '', '', '', '', '', '', '', '', '', ''], # Empty row
             [Paragraph('Name/Signature:', signature_style), Paragraph('_____________________', signature_style), '', '', '', '', '', '', '', '', '', '', '']
         ]
 
@@ -1016,9 +1346,7 @@ def export_to_pdf():
 
         if messagebox.askyesno("Open File", "Do you want to open the exported PDF file?", parent=main_app.master):
             try:
-                if platform.system() == 'Darwin': os.system(f'open "{filename}"')
-                elif platform.system() == 'Windows': os.startfile(filename)
-                else: os.system(f'xdg-open "{filename}"')
+                open_file_with_default_app(filename)
             except Exception as open_err:
                  messagebox.showwarning("Open File Error", f"Could not automatically open the file:\n{open_err}", parent=main_app.master)
 
@@ -1053,7 +1381,10 @@ def export_to_excel():
     main_app.update_status("Exporting to Excel...", show_progress=True)
 
     try:
-        workbook = xlsxwriter.Workbook(filename)
+        import xlsxwriter # Loaded only when exporting
+        # constant_memory flushes each finished row to disk, so memory stays flat for big sessions
+        # (rows must be written strictly top to bottom, which the loop below does)
+        workbook = xlsxwriter.Workbook(filename, {'constant_memory': True, 'default_date_format': 'dd/mm/yyyy hh:mm:ss'})
         worksheet = workbook.add_worksheet("QFT Results")
 
         # --- Excel Formats (Add WP format) ---
@@ -1088,57 +1419,69 @@ def export_to_excel():
                       'TB1_Nil', 'TB2_Nil', 'Mit_Nil', 'QFT_Result', 'Comments', 'Requested Date']
         worksheet.write_row(0, 0, headers_s2, header_format)
 
+        # --- Adjust Column Widths (Match S2's Excel Export) ---
+        worksheet.set_column('A:A', 12)
+        worksheet.set_column('B:I', 10) # B to I covers Nil_Result to QFT_Result
+        worksheet.set_column('J:J', 15)
+        worksheet.set_column('K:K', 20)
+        worksheet.freeze_panes(1, 0)
+
         # --- Write Data ---
+        # Hoist everything that doesn't change per row
         decimals = app_settings['decimal_places']
+        fmt = format_number_with_decimals
+        # Typed writers skip the generic write() dispatch (type checks plus formula/URL regexes on
+        # every string), which is where most of the export time went
+        write = worksheet.write
+        write_string = worksheet.write_string
+        write_number = worksheet.write_number
+        write_datetime = worksheet.write_datetime
+        num_values = _num_values
+        qft_fmt = {'POS': pos_format, 'POS*': pos_format, 'NEG': neg_format, 'IND': ind_format}
+
         for r_idx, row_dict in enumerate(data_to_export, 1):
-            col = 0
             barcode = row_dict.get('barcode', '')
-            worksheet.write(r_idx, col, barcode, cell_format); col += 1
+            if barcode and isinstance(barcode, str):
+                write_string(r_idx, 0, barcode, cell_format)
+            else:
+                write(r_idx, 0, barcode, cell_format)
 
-            # Numerical values (Nil to Mit-Nil)
-            num_keys = ['nil_result', 'tb1_result', 'tb2_result', 'mit_result', 'tb1_nil', 'tb2_nil', 'mit_nil']
-            for key in num_keys:
-                val_str = format_number_with_decimals(row_dict.get(key, ''), decimals)
-                try:
-                    if '>' in val_str or '<' in val_str or val_str.strip() == "":
-                         worksheet.write_string(r_idx, col, val_str, cell_format)
-                    else:
-                         worksheet.write_number(r_idx, col, float(val_str), cell_format)
-                except ValueError:
-                     worksheet.write_string(r_idx, col, val_str, cell_format)
-                col += 1
+            # Numerical values (Nil to Mit-Nil): numbers go in as floats, '<'/'>' values and blanks stay strings
+            for col, value in enumerate(num_values(row_dict), 1):
+                val_str = fmt(value, decimals)
+                if '>' in val_str or '<' in val_str or val_str.strip() == "":
+                    write_string(r_idx, col, val_str, cell_format)
+                else:
+                    try:
+                        write_number(r_idx, col, float(val_str), cell_format)
+                    except ValueError:
+                        write_string(r_idx, col, val_str, cell_format)
 
             # QFT Result (apply specific format including WP)
             qft_result = str(row_dict.get('qft_result', '')).upper()
             comment = calculate_comment(row_dict) # Calculate comment
-            is_wp = "WP" in comment             # Check if WP
 
-            qft_format_to_use = cell_format # Default
-            if is_wp: qft_format_to_use = wp_format          # WP format first
-            elif qft_result in ('POS', 'POS*'): qft_format_to_use = pos_format
-            elif qft_result == 'NEG': qft_format_to_use = neg_format
-            elif qft_result == 'IND': qft_format_to_use = ind_format
+            # WP format first, then the per-result format (default cell format)
+            qft_format_to_use = wp_format if "WP" in comment else qft_fmt.get(qft_result, cell_format)
 
-            # Apply the determined format to this cell
-            worksheet.write(r_idx, col, qft_result, qft_format_to_use); col += 1
+            # Apply the determined format to this cell (an empty result stays a blank cell, as write() left it)
+            if qft_result:
+                write_string(r_idx, 8, qft_result, qft_format_to_use)
+            else:
+                worksheet.write_blank(r_idx, 8, None, qft_format_to_use)
 
             # Comment
-            worksheet.write(r_idx, col, comment, comment_format); col += 1 # Use pre-calculated comment
+            if comment:
+                write_string(r_idx, 9, comment, comment_format) # Use pre-calculated comment
+            else:
+                worksheet.write_blank(r_idx, 9, None, comment_format)
 
             # Requested Date
             req_date = row_dict.get('requested_date')
             if isinstance(req_date, datetime.datetime):
-                worksheet.write_datetime(r_idx, col, req_date, date_format_s2)
+                write_datetime(r_idx, 10, req_date, date_format_s2)
             else:
-                 worksheet.write(r_idx, col, str(req_date) if req_date else '', cell_format)
-            col += 1
-
-        # --- Adjust Column Widths (Match S2's Excel Export) ---
-        worksheet.set_column('A:A', 12)
-        worksheet.set_column('B:I', 10) # B to I covers Nil_Result to QFT_Result
-        worksheet.set_column('J:J', 15)
-        worksheet.set_column('K:K', 20)
-        worksheet.freeze_panes(1, 0)
+                write(r_idx, 10, str(req_date) if req_date else '', cell_format)
 
         workbook.close()
         main_app.update_status("Excel export complete.", hide_progress=True)
@@ -1146,9 +1489,7 @@ def export_to_excel():
 
         if messagebox.askyesno("Open File", "Do you want to open the exported Excel file?", parent=main_app.master):
              try:
-                 if platform.system() == 'Darwin': os.system(f'open "{filename}"')
-                 elif platform.system() == 'Windows': os.startfile(filename)
-                 else: os.system(f'xdg-open "{filename}"')
+                 open_file_with_default_app(filename)
              except Exception as open_err:
                   messagebox.showwarning("Open File Error", f"Could not automatically open the file:\n{open_err}", parent=main_app.master)
 
@@ -1189,32 +1530,42 @@ def export_to_csv():
                       'TB1_Nil', 'TB2_Nil', 'Mit_Nil', 'QFT_Result', 'Comments', 'Requested Date']
         decimals = app_settings['decimal_places']
 
+        fmt = format_number_with_decimals
+        num_values = _num_values
+
+        # Module globals used per row, bound here so csv_row reads them from its closure
+        comment_for = calculate_comment
+        datetime_cls = datetime.datetime
+
+        def csv_row(row_dict):
+            # Format data row according to S2 headers/order
+            g = row_dict.get # Bound once per row
+            row_values = [g('barcode', '')]
+            row_values.extend([fmt(value, decimals) for value in num_values(row_dict)])
+            row_values.append(g('qft_result', ''))
+            row_values.append(comment_for(row_dict)) # Include comment column like S2
+            # Format date for CSV (YYYY-MM-DD HH:MM:SS is a good standard)
+            req_date = g('requested_date')
+            row_values.append(req_date.strftime('%Y-%m-%d %H:%M:%S') if isinstance(req_date, datetime_cls) else str(req_date or ''))
+            return row_values
+
         # Use standard comma delimiter unless ';' is strongly preferred
         # Script 2 implicitly used comma with default writer
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        # 1 MB write buffer + writerows in batches of 1000 rows keeps syscalls and C calls down
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
             writer = csv.writer(csvfile) # Default comma delimiter
             writer.writerow(headers_s2)
 
-            for row_dict in data_to_export:
-                # Format data row according to S2 headers/order
-                row_values = [
-                    row_dict.get('barcode', ''),
-                    format_number_with_decimals(row_dict.get('nil_result', ''), decimals),
-                    format_number_with_decimals(row_dict.get('tb1_result', ''), decimals),
-                    format_number_with_decimals(row_dict.get('tb2_result', ''), decimals),
-                    format_number_with_decimals(row_dict.get('mit_result', ''), decimals),
-                    format_number_with_decimals(row_dict.get('tb1_nil', ''), decimals),
-                    format_number_with_decimals(row_dict.get('tb2_nil', ''), decimals),
-                    format_number_with_decimals(row_dict.get('mit_nil', ''), decimals),
-                    row_dict.get('qft_result', ''),
-                    calculate_comment(row_dict), # Include comment column like S2
-                ]
-                # Format date for CSV (YYYY-MM-DD HH:MM:SS is a good standard)
-                req_date = row_dict.get('requested_date')
-                date_str = req_date.strftime('%Y-%m-%d %H:%M:%S') if isinstance(req_date, datetime.datetime) else str(req_date or '')
-                row_values.append(date_str)
-
-                writer.writerow(row_values)
+            rows = map(csv_row, data_to_export)
+            while True:
+                batch = list(itertools.islice(rows, 1000))
+                if not batch:
+                    break
+                writer.writerows(batch)
+
+            # One fsync once everything is written, so the file is on disk before we report success
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
 
         main_app.update_status("CSV export complete.", hide_progress=True)
         messagebox.showinfo("Export CSV", "CSV file exported successfully!")
@@ -1222,9 +1573,7 @@ def export_to_csv():
         # Ask to open file
         if messagebox.askyesno("Open File", "Do you want to open the exported CSV file?", parent=main_app.master):
              try:
-                 if platform.system() == 'Darwin': os.system(f'open "{filename}"')
-                 elif platform.system() == 'Windows': os.startfile(filename)
-                 else: os.system(f'xdg-open "{filename}"')
+                 open_file_with_default_app(filename)
              except Exception as open_err:
                   messagebox.showwarning("Open File Error", f"Could not automatically open the file:\n{open_err}", parent=main_app.master)
 
@@ -1273,7 +1622,7 @@ def save_session(auto_save=False, pre_clear=False, session_name_in=None):
                 return False # User cancelled manual save
 
     main_app.update_status("Saving session...", show_progress=True)
-    conn = None # Ensure conn is defined for finally block
+    conn = None # Ensure conn is defined for the except blocks
     try:
         conn = get_database_connection()
         if not conn:
@@ -1284,7 +1633,7 @@ def save_session(auto_save=False, pre_clear=False, session_name_in=None):
         timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
         # Check if session name already exists
-        cursor.execute("SELECT session_id FROM sessions WHERE session_name = ?", (session_name,))
+        cursor.execute(SQL_FIND_SESSION_BY_NAME, (session_name,))
         existing = cursor.fetchone()
 
         session_id = None
@@ -1310,7 +1659,6 @@ def save_session(auto_save=False, pre_clear=False, session_name_in=None):
                       cursor.execute("UPDATE sessions SET last_modified = ? WHERE session_id = ?", (timestamp, session_id))
                  else:
                       main_app.update_status("Save cancelled (name exists).", hide_progress=True)
-                      conn.close()
                       return False # Indicate manual save failed/cancelled overwrite
 
         else: # Session name is new, insert it
@@ -1322,32 +1670,23 @@ def save_session(auto_save=False, pre_clear=False, session_name_in=None):
 
         # Get data and insert results
         data_to_save = main_app.get_data_for_export() # Get current data state
-        results_to_insert = []
-        for row_dict in data_to_save:
-            req_date = row_dict.get('requested_date')
-            # Use consistent DB date format
-            date_str = req_date.strftime('%Y-%m-%d %H:%M:%S') if isinstance(req_date, datetime.datetime) else str(req_date or '')
-
-            results_to_insert.append((
-                session_id,
-                str(row_dict.get('barcode', '')),
-                str(row_dict.get('nil_result', '')),
-                str(row_dict.get('tb1_result', '')),
-                str(row_dict.get('tb2_result', '')),
-                str(row_dict.get('mit_result', '')),
-                str(row_dict.get('tb1_nil', '')),
-                str(row_dict.get('tb2_nil', '')),
-                str(row_dict.get('mit_nil', '')),
-                str(row_dict.get('qft_result', '')),
-                date_str
-            ))
-
-        cursor.executemany('''
-            INSERT INTO results (
-                session_id, barcode, nil_result, tb1_result, tb2_result, mit_result,
-                tb1_nil, tb2_nil, mit_nil, qft_result, requested_date
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', results_to_insert)
+        num_values = _num_values
+        datetime_cls = datetime.datetime # Bound once, not a global + attribute lookup per row
+
+        def result_rows():
+            # Rows are streamed into executemany instead of building a second full copy as tuples first
+            for row_dict in data_to_save:
+                g = row_dict.get
+                req_date = g('requested_date')
+                # Use consistent DB date format
+                date_str = req_date.strftime('%Y-%m-%d %H:%M:%S') if isinstance(req_date, datetime_cls) else str(req_date or '')
+                # set_data_rows/add_data_rows already store every field except the date as str,
+                # so the values go to sqlite as they are
+                yield (session_id, g('barcode', ''), *num_values(row_dict), g('qft_result', ''), date_str)
+
+        # Same transaction as the session row above (sqlite3 opened it implicitly), committed once below
+        cursor.executemany(SQL_INSERT_RESULT, result_rows())
+        _update_session_summary(cursor, session_id)
 
         conn.commit()
 
@@ -1372,11 +1711,26 @@ def save_session(auto_save=False, pre_clear=False, session_name_in=None):
         main_app.update_status("Save failed (unexpected error).", hide_progress=True)
         traceback.print_exc()
         return False
-    finally:
-        if conn:
-            conn.close()
 
 
+# Tcl side of _insert_tree_rows: loops over the (values, tag) pairs inside the interpreter;
+# the tag is also used as the item id, so callers can map an iid back to their data without asking Tk
+_TREE_INSERT_PROC = '''
+proc qft_tree_insert_rows_by_id {tree rows} {
+    foreach {values tag} $rows {
+        $tree insert {} end -id $tag -values $values -tags [list $tag]
+    }
+}
+'''
+
+def _insert_tree_rows(tree, rows):
+    """Appends (values, tag) rows to a ttk.Treeview with a single Tcl call (tags must be unique, they become the iids)."""
+    tcl = tree.tk
+    if not tcl.call('info', 'commands', 'qft_tree_insert_rows_by_id'):
+        tcl.eval(_TREE_INSERT_PROC) # Defined once per interpreter
+    # Tuples go over as real Tcl lists, so values with spaces/braces need no quoting
+    tcl.call('qft_tree_insert_rows_by_id', str(tree), tuple(itertools.chain.from_iterable(rows)))
+
 def manage_sessions():
     """Opens the session management window (Keep Script 1's implementation)."""
     global main_app
@@ -1386,26 +1740,18 @@ def manage_sessions():
         if not conn: return
 
         cursor = conn.cursor()
-        # Use Script 1's more detailed query
+        # Script 1's detailed columns, read from the summary stored with each session (no results scan)
         cursor.execute('''
             SELECT
-                s.session_id, s.session_name, s.import_date, s.last_modified,
-                COUNT(r.result_id) as total_samples,
-                SUM(CASE WHEN r.qft_result = 'POS' OR r.qft_result = 'POS*' THEN 1 ELSE 0 END) as pos,
-                SUM(CASE WHEN r.qft_result = 'NEG' THEN 1 ELSE 0 END) as neg,
-                SUM(CASE WHEN r.qft_result = 'IND' THEN 1 ELSE 0 END) as ind,
-                MIN(r.requested_date) as earliest_date,
-                MAX(r.requested_date) as latest_date
-            FROM sessions s
-            LEFT JOIN results r ON s.session_id = r.session_id
-            GROUP BY s.session_id, s.session_name, s.import_date, s.last_modified
-            ORDER BY s.last_modified DESC
+                session_id, session_name, import_date, last_modified,
+                total_samples, pos, neg, ind, earliest_date, latest_date
+            FROM sessions
+            ORDER BY last_modified DESC
         ''')
         sessions_data = cursor.fetchall()
 
         if not sessions_data:
             messagebox.showinfo("Manage Sessions", "No saved sessions found.", parent=main_app.master)
-            conn.close() # Close connection if no sessions
             return
 
         # --- Session Management Window (Use Script 1's layout) ---
@@ -1444,6 +1790,7 @@ def manage_sessions():
         tree.pack(side='left', fill='both', expand=True)
 
         # Populate Treeview
+        tree_rows = []
         for row in sessions_data:
             (session_id, name, imp_date, mod_date, total, pos, neg, ind, early_dt, late_dt) = row
             total, pos, neg, ind = (total or 0, pos or 0, neg or 0, ind or 0) # Handle None
@@ -1452,16 +1799,17 @@ def manage_sessions():
             try:
                 # Use the correct DB date format '%Y-%m-%d %H:%M:%S'
                 if early_dt and late_dt:
-                    e_dt = datetime.datetime.strptime(early_dt, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d')
-                    l_dt = datetime.datetime.strptime(late_dt, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d')
+                    e_dt = _parse_db_datetime(early_dt).strftime('%Y-%m-%d')
+                    l_dt = _parse_db_datetime(late_dt).strftime('%Y-%m-%d')
                     date_range_str = f"{e_dt} to {l_dt}" if e_dt != l_dt else e_dt
                 elif early_dt: # Handle cases where only one date might exist
-                     date_range_str = datetime.datetime.strptime(early_dt, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d')
+                     date_range_str = _parse_db_datetime(early_dt).strftime('%Y-%m-%d')
                 elif late_dt:
-                     date_range_str = datetime.datetime.strptime(late_dt, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d')
+                     date_range_str = _parse_db_datetime(late_dt).strftime('%Y-%m-%d')
             except (ValueError, TypeError): pass # Ignore parsing errors
 
-            tree.insert('', 'end', values=(name, mod_date, total, pos, neg, ind, date_range_str), tags=(str(session_id),))
+            tree_rows.append(((name, mod_date, total, pos, neg, ind, date_range_str), str(session_id)))
+        _insert_tree_rows(tree, tree_rows)
 
         # --- Action Buttons (Script 1) ---
         button_frame = ttk.Frame(session_window, style='Dialog.TFrame')
@@ -1480,7 +1828,7 @@ def manage_sessions():
         rename_button.pack(side='left', padx=5)
 
         cancel_button = ttk.Button(button_frame, text="Close", style='Dialog.TButton',
-                                 command=lambda: (conn.close(), session_window.destroy()))
+                                 command=session_window.destroy)
         cancel_button.pack(side='right', padx=5)
 
         # Enable buttons on selection
@@ -1499,10 +1847,8 @@ def manage_sessions():
 
     except sqlite3.Error as db_err:
         messagebox.showerror("Database Error", f"Failed to retrieve sessions: {db_err}", parent=main_app.master)
-        if conn: conn.close() # Close connection on error
     except Exception as e:
         messagebox.showerror("Error", f"Failed to open session manager: {e}", parent=main_app.master)
-        if conn: conn.close() # Close connection on error
 
 
 def load_selected_session(tree, session_window, db_conn_passed_in=None):
@@ -1536,26 +1882,21 @@ def load_selected_session(tree, session_window, db_conn_passed_in=None):
 
         cursor = conn.cursor()
         # Select all necessary columns from 'results' table
-        cursor.execute('''
-            SELECT barcode, nil_result, tb1_result, tb2_result, mit_result,
-                   tb1_nil, tb2_nil, mit_nil, qft_result, requested_date
-            FROM results
-            WHERE session_id = ?
-        ''', (session_id,))
-        results_data = cursor.fetchall()
+        cursor.execute(SQL_SELECT_SESSION_RESULTS, (session_id,))
 
         loaded_rows = []
         # Use correct indices based on the SELECT query
         col_names = ['barcode', 'nil_result', 'tb1_result', 'tb2_result', 'mit_result',
                      'tb1_nil', 'tb2_nil', 'mit_nil', 'qft_result', 'requested_date']
-        for row in results_data:
+        # Rows are read straight off the cursor, no fetchall() list of tuples next to loaded_rows
+        for row in cursor:
             row_dict = dict(zip(col_names, row)) # Create dict directly
 
             # Convert date string back to datetime object using DB format
             date_str = row_dict.get('requested_date')
             if date_str and isinstance(date_str, str):
                 try:
-                    row_dict['requested_date'] = datetime.datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
+                    row_dict['requested_date'] = _parse_db_datetime(date_str)
                 except (ValueError, TypeError):
                     print(f"Warning: Could not parse date '{date_str}' for barcode {row_dict['barcode']}. Setting to None.")
                     row_dict['requested_date'] = None
@@ -1581,9 +1922,6 @@ def load_selected_session(tree, session_window, db_conn_passed_in=None):
         messagebox.showerror("Load Error", f"An unexpected error occurred loading session {e}", parent=session_window)
         main_app.update_status("Load failed (unexpected error).", hide_progress=True)
         traceback.print_exc()
-    finally:
-        if conn and not db_conn_passed_in:
-            conn.close()
 
 # Keep delete_selected_session from Script 1
 def delete_selected_session(tree, session_window, db_conn):
@@ -1647,13 +1985,15 @@ def rename_selected_session(tree, session_window, db_conn):
 
     try:
         cursor = db_conn.cursor()
+        modified_str = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         # Check if new name already exists (using UNIQUE constraint)
         cursor.execute("UPDATE sessions SET session_name = ?, last_modified = ? WHERE session_id = ?",
-                       (new_name, datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'), session_id))
+                       (new_name, modified_str, session_id))
         db_conn.commit()
 
-        # Update treeview
-        tree.item(selection[0], values=(new_name,) + item['values'][1:]) # Update name in values tuple
+        # Update just the two changed cells (the Modified column was left stale before)
+        tree.set(selection[0], 'name', new_name)
+        tree.set(selection[0], 'modified', modified_str)
         messagebox.showinfo("Rename Session", f"Session renamed to '{new_name}'.", parent=session_window)
 
     except sqlite3.IntegrityError: # Catch unique constraint violation
@@ -1695,18 +2035,55 @@ def show_global_search():
 
     search_results_data = [] # To store results for export
     tree = None # Define tree here so clear_search_results can access it
+    # Only the rows scrolled into view are in the tree: search_results_data[:shown_count]
+    shown_count = 0
+    TREE_CHUNK = 200 # Rows added per batch, several screens' worth
+    more_rows_pending = False # A batch is already queued by on_tree_yscroll
 
     # --- Function Definitions within show_global_search ---
+    def show_more_rows(count=TREE_CHUNK):
+        """Appends the next `count` search results to the tree (iid and tag = index into search_results_data)."""
+        nonlocal shown_count
+        end = min(shown_count + count, len(search_results_data))
+        if end <= shown_count: return
+        decimals = app_settings['decimal_places']
+        fmt = format_number_with_decimals
+        tree_rows = []
+        for index in range(shown_count, end):
+            session_name, barcode, *num_cells, qft_result, comment, req_date_str = _search_row_values(search_results_data[index])
+            display_row = (session_name, barcode, *[fmt(value, decimals) for value in num_cells],
+                           qft_result, comment, req_date_str)
+            tree_rows.append((display_row, str(index)))
+        _insert_tree_rows(tree, tree_rows)
+        shown_count = end
+
+    def load_pending_rows():
+        """Idle callback for on_tree_yscroll: appends one batch per scheduled request."""
+        nonlocal more_rows_pending
+        more_rows_pending = False
+        show_more_rows()
+
+    def on_tree_yscroll(first, last):
+        """Scrollbar update; near the bottom of the loaded rows the next batch is appended."""
+        nonlocal more_rows_pending
+        vsb.set(first, last)
+        # A scrollbar drag fires this for every pixel moved, so only one batch is queued at a time
+        # (otherwise each motion event past 90% would append its own batch of rows)
+        if float(last) > 0.9 and shown_count < len(search_results_data) and not more_rows_pending:
+            more_rows_pending = True
+            search_window.after_idle(load_pending_rows)
+
     def perform_search(event=None):
         # ... (perform_search code remains the same as before) ...
-        nonlocal search_results_data, tree # Make tree accessible
+        nonlocal search_results_data, tree, shown_count # Make tree accessible
         term = search_var.get().strip()
         if not term:
             messagebox.showwarning("Search", "Please enter a barcode (or part of it) to search.", parent=search_window)
             return
 
-        for i in tree.get_children(): tree.delete(i)
+        tree.delete(*tree.get_children()) # One Tcl call instead of one per row
         search_results_data = []
+        shown_count = 0
         export_button['state'] = 'disabled'
         status_label.config(text="Searching...")
         search_window.update_idletasks()
@@ -1717,22 +2094,13 @@ def show_global_search():
             if not conn: return
 
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT
-                    s.session_name, r.barcode, r.nil_result, r.tb1_result, r.tb2_result, r.mit_result,
-                    r.tb1_nil, r.tb2_nil, r.mit_nil, r.qft_result, r.requested_date
-                FROM results r
-                JOIN sessions s ON r.session_id = s.session_id
-                WHERE r.barcode LIKE ?
-                ORDER BY s.last_modified DESC, r.requested_date DESC
-            ''', (f'%{term}%',))
+            cursor.execute(SQL_SEARCH_BARCODE, (f'%{term}%',))
             results = cursor.fetchall()
 
             if not results:
                 status_label.config(text=f"No results found for '{term}'.")
                 return
 
-            decimals = app_settings['decimal_places']
             temp_data_list = []
             for row in results:
                 (s_name, bc, nil, tb1, tb2, mit, t1n, t2n, mitn, qft, req_dt_str) = row
@@ -1741,29 +2109,21 @@ def show_global_search():
                     'tb2_result': tb2, 'mit_result': mit, 'tb1_nil': t1n, 'tb2_nil': t2n,
                     'mit_nil': mitn, 'qft_result': qft
                 }
-                comment = calculate_comment(row_dict)
-                row_dict['comment'] = comment
                 row_dict['requested_date_str'] = req_dt_str
                 try:
-                    row_dict['requested_date_obj'] = datetime.datetime.strptime(req_dt_str, '%Y-%m-%d %H:%M:%S') if req_dt_str else None
+                    row_dict['requested_date_obj'] = _parse_db_datetime(req_dt_str) if req_dt_str else None
                 except (ValueError, TypeError):
                     row_dict['requested_date_obj'] = None
                 temp_data_list.append(row_dict)
 
+            # Comments for all rows at once
+            for row_dict, comment in zip(temp_data_list, map(calculate_comment, temp_data_list)):
+                row_dict['comment'] = comment
+
             search_results_data = temp_data_list
-            for index, row_dict in enumerate(search_results_data):
-                 display_row = (
-                     row_dict['session_name'], row_dict['barcode'],
-                     format_number_with_decimals(row_dict['nil_result'], decimals),
-                     format_number_with_decimals(row_dict['tb1_result'], decimals),
-                     format_number_with_decimals(row_dict['tb2_result'], decimals),
-                     format_number_with_decimals(row_dict['mit_result'], decimals),
-                     format_number_with_decimals(row_dict['tb1_nil'], decimals),
-                     format_number_with_decimals(row_dict['tb2_nil'], decimals),
-                     format_number_with_decimals(row_dict['mit_nil'], decimals),
-                     row_dict['qft_result'], row_dict['comment'], row_dict['requested_date_str']
-                 )
-                 tree.insert('', 'end', values=display_row, tags=(str(index),))
+            # Large result sets aren't put in the tree all at once: the first batch goes in now and
+            # on_tree_yscroll appends more as the user scrolls down (export still uses every row)
+            show_more_rows()
 
             status_label.config(text=f"{len(results)} result(s) found for '{term}'.")
             if results:
@@ -1775,16 +2135,14 @@ def show_global_search():
             status_label.config(text="An unexpected error occurred.")
             messagebox.showerror("Search Error", f"Search failed: {e}", parent=search_window)
             traceback.print_exc()
-        finally:
-            if conn: conn.close()
 
     # *** ADDED: Function to clear search ***
     def clear_search_results():
-        nonlocal search_results_data, tree, export_button # Need to modify these
+        nonlocal search_results_data, tree, export_button, shown_count # Need to modify these
         search_var.set("") # Clear search box
-        for i in tree.get_children(): # Clear treeview
-            tree.delete(i)
+        tree.delete(*tree.get_children()) # Clear treeview in one call
         search_results_data = [] # Clear data list
+        shown_count = 0
         status_label.config(text="Enter barcode and press Search.") # Reset status
         export_button['state'] = 'disabled' # Disable export button
         search_entry.focus_set() # Set focus back to entry
@@ -1809,6 +2167,7 @@ def show_global_search():
 
     # Ctrl+A binding...
     def select_all_items(event=None):
+        show_more_rows(len(search_results_data)) # Select all means every result, not just the loaded ones
         tree.selection_add(tree.get_children())
         return "break"
     tree.bind('<Control-a>', select_all_items)
@@ -1832,7 +2191,7 @@ def show_global_search():
     vsb.pack(side='right', fill='y')
     hsb = ttk.Scrollbar(results_frame, orient="horizontal", command=tree.xview)
     hsb.pack(side='bottom', fill='x')
-    tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+    tree.configure(yscrollcommand=on_tree_yscroll, xscrollcommand=hsb.set)
     tree.pack(side='left', fill='both', expand=True)
 
     # --- Status and Export ---
@@ -1865,19 +2224,12 @@ def show_global_search():
         export_choice_win.title(export_title)
         dialog_width = 350
         dialog_height = 410
-        export_choice_win.geometry(f"{dialog_width}x{dialog_height}")
         export_choice_win.resizable(False, False)
-        export_choice_win.transient(search_window)
-        export_choice_win.grab_set()
         export_choice_win.configure(bg='#f0f2f5')
-        main_app.center_window(export_choice_win, dialog_width, dialog_height)
 
         main_frame_export = ttk.Frame(export_choice_win, style='TFrame', padding=(20, 15))
         main_frame_export.pack(fill=tk.BOTH, expand=True)
 
-        try:
-             main_app.style.configure('DialogHeader.TLabel', font=('Open Sans', 16, 'bold'), foreground='#1976D2', background='#f0f2f5')
-        except tk.TclError: pass
         title_label_export = ttk.Label(main_frame_export, text=export_title, style='DialogHeader.TLabel', anchor='center')
         title_label_export.pack(pady=(0, 5))
 
@@ -1891,9 +2243,8 @@ def show_global_search():
             data_to_export_list = []
             if selected_item_ids:
                 try:
-                    for item_id in selected_item_ids:
-                        original_index = int(tree.item(item_id, 'tags')[0])
-                        data_to_export_list.append(search_results_data[original_index])
+                    # Item ids are the indexes into search_results_data (see show_more_rows), no Tk lookups needed
+                    data_to_export_list = [search_results_data[int(item_id)] for item_id in selected_item_ids]
                 except (IndexError, ValueError) as e:
                     messagebox.showerror("Export Error", f"Error retrieving selected data: {e}", parent=export_choice_win)
                     export_choice_win.destroy()
@@ -1917,9 +2268,6 @@ def show_global_search():
             {'text': "📝 CSV File",   'desc': "Plain text, comma-separated", 'command': lambda: do_export('csv')}
         ]
 
-        try:
-            main_app.style.configure('DialogDesc.TLabel', font=('Open Sans', 9), foreground='#666666', background='#f0f2f5')
-        except tk.TclError: pass
 
         for option in export_options_list:
             option_sub_frame = ttk.Frame(options_frame_export, style='TFrame')
@@ -1933,13 +2281,53 @@ def show_global_search():
         cancel_button = ttk.Button(main_frame_export, text="Cancel", command=export_choice_win.destroy, style='Alt.TButton', width=20)
         cancel_button.pack(pady=(5, 10))
 
+        # Size/center and grab once the widgets exist
+        main_app.center_window(export_choice_win, dialog_width, dialog_height)
+        export_choice_win.transient(search_window)
+        export_choice_win.grab_set()
+
     # --- Define and Place the SINGLE Export Button ---
     # Ensure this is the ONLY place the export button for the status_export_frame is defined and packed.
     export_button = ttk.Button(status_export_frame, text="Export Results...", style='Dialog.TButton', state='disabled',
                                command=export_search_results_dialog)
     export_button.pack(side='right') # Packed on the right side of the status frame
+
+
+_SearchPdfStyles = namedtuple('_SearchPdfStyles', [
+    'title', 'date', 'cell', 'comment', 'qft_pos', 'qft_wp', 'qft_neg', 'qft_ind', 'header_row'])
+
+@functools.lru_cache(maxsize=8)
+def _search_pdf_styles(pos_text, wp_text, neg_text, ind_text):
+    """Builds the ParagraphStyles and header cells for the global search PDF (cached per set of text colors)."""
+    from reportlab.lib import colors as reportlab_colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import Paragraph
+    styles = getSampleStyleSheet()
+    # Similar to main PDF export, smaller font
+    header_style = ParagraphStyle('SearchHeader', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=9, alignment=1)
+    cell_style = ParagraphStyle('SearchCell', parent=styles['Normal'], fontSize=8, alignment=1)
+    headers = ['Session', 'Barcode', 'Nil', 'TB1', 'TB2', 'Mit', 'TB1-Nil', 'TB2-Nil', 'Mit-Nil', 'QFT Result', 'Comment', 'Req. Date']
+    return _SearchPdfStyles(
+        title=ParagraphStyle('SearchTitle', parent=styles['h1'], fontSize=18, alignment=1, spaceAfter=12),
+        date=ParagraphStyle('SearchDate', parent=styles['Normal'], fontSize=10, alignment=1, spaceAfter=12),
+        cell=cell_style,
+        comment=ParagraphStyle('SearchComment', parent=cell_style, textColor=reportlab_colors.grey),
+        # Styles with colors for QFT cells
+        qft_pos=ParagraphStyle('SearchQFT_POS', parent=cell_style, textColor=hex_to_color(pos_text)),
+        qft_wp=ParagraphStyle('SearchQFT_WP', parent=cell_style, textColor=hex_to_color(wp_text)),
+        qft_neg=ParagraphStyle('SearchQFT_NEG', parent=cell_style, textColor=hex_to_color(neg_text)),
+        qft_ind=ParagraphStyle('SearchQFT_IND', parent=cell_style, textColor=hex_to_color(ind_text)),
+        # Header cells never change, so the Paragraphs are built once and reused by every export
+        header_row=[Paragraph(h, header_style) for h in headers],
+    )
+
 def export_global_search_to_pdf(results_list):
     """Exports global search results list (of dicts) to PDF."""
+    # reportlab is imported lazily so app startup doesn't pay for it
+    from reportlab.lib import colors as reportlab_colors # Renamed to avoid clash
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.platypus import (PageTemplate, Frame,
+                                    Paragraph, Spacer, Table, LongTable, TableStyle)
     if not results_list: return
 
     default_filename = f"QFT_GlobalSearch_{datetime.datetime.now().strftime('%Y%m%d')}.pdf"
@@ -1951,71 +2339,47 @@ def export_global_search_to_pdf(results_list):
     main_app.update_status("Exporting search results to PDF...", show_progress=True)
 
     try:
-        doc = SimpleDocTemplate(filename, pagesize=landscape(letter),
-                                rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-        styles = getSampleStyleSheet()
+        doc = _row_table_doc_class()(filename, pagesize=landscape(letter), pageCompression=1,
+                                     rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
         story = []
 
-        # --- PDF Styles (Similar to main PDF export, maybe smaller font) ---
+        # --- PDF Styles (cached like the main PDF export's; only rebuilt when the text colors change) ---
         current_colors = app_settings
-        title_style = ParagraphStyle('SearchTitle', parent=styles['h1'], fontSize=18, alignment=1, spaceAfter=12)
-        date_style = ParagraphStyle('SearchDate', parent=styles['Normal'], fontSize=10, alignment=1, spaceAfter=12)
-        header_style = ParagraphStyle('SearchHeader', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=9, alignment=1)
-        cell_style = ParagraphStyle('SearchCell', parent=styles['Normal'], fontSize=8, alignment=1)
-        comment_style = ParagraphStyle('SearchComment', parent=cell_style, textColor=reportlab_colors.grey)
-        # Styles with colors for QFT cells
-        qft_pos_style = ParagraphStyle('SearchQFT_POS', parent=cell_style, textColor=hex_to_color(current_colors['pos_text']))
-        qft_wp_style = ParagraphStyle('SearchQFT_WP', parent=cell_style, textColor=hex_to_color(current_colors['wp_text']))
-        qft_neg_style = ParagraphStyle('SearchQFT_NEG', parent=cell_style, textColor=hex_to_color(current_colors['neg_text']))
-        qft_ind_style = ParagraphStyle('SearchQFT_IND', parent=cell_style, textColor=hex_to_color(current_colors['ind_text']))
-
-
-        # --- PDF Header ---
-        story.append(Paragraph("Global Search Results", title_style))
-        story.append(Paragraph(f"Exported: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", date_style))
-        story.append(Spacer(1, 15))
-
-        # --- PDF Data Table ---
-        # Define headers including Session Name
-        headers = ['Session', 'Barcode', 'Nil', 'TB1', 'TB2', 'Mit', 'TB1-Nil', 'TB2-Nil', 'Mit-Nil', 'QFT Result', 'Comment', 'Req. Date']
-        table_data = [[Paragraph(h, header_style) for h in headers]]
+        pdf_styles = _search_pdf_styles(current_colors['pos_text'], current_colors['wp_text'],
+                                        current_colors['neg_text'], current_colors['ind_text'])
+        title_style = pdf_styles.title
+        date_style = pdf_styles.date
+        cell_style = pdf_styles.cell
+        comment_style = pdf_styles.comment
+        qft_pos_style = pdf_styles.qft_pos
+        qft_wp_style = pdf_styles.qft_wp
+        qft_neg_style = pdf_styles.qft_neg
+        qft_ind_style = pdf_styles.qft_ind
+
+
+        # Hoist per-row lookups out of the table loop
         decimals = app_settings['decimal_places']
-
-        for row_dict in results_list:
-            # Determine QFT style
-            qft_result = str(row_dict.get('qft_result', ' ')).upper()
-            comment = row_dict.get('comment', '') # Comment already calculated
-            is_wp = "WP" in comment
-
-            current_qft_style = cell_style
-            if is_wp: current_qft_style = qft_wp_style
-            elif qft_result in ('POS', 'POS*'): current_qft_style = qft_pos_style
-            elif qft_result == 'NEG': current_qft_style = qft_neg_style
-            elif qft_result == 'IND': current_qft_style = qft_ind_style
-
-            row_values = [
-                Paragraph(str(row_dict.get('session_name', '')), cell_style),
-                Paragraph(str(row_dict.get('barcode', '')), cell_style),
-                Paragraph(format_number_with_decimals(row_dict.get('nil_result', ''), decimals), cell_style),
-                Paragraph(format_number_with_decimals(row_dict.get('tb1_result', ''), decimals), cell_style),
-                Paragraph(format_number_with_decimals(row_dict.get('tb2_result', ''), decimals), cell_style),
-                Paragraph(format_number_with_decimals(row_dict.get('mit_result', ''), decimals), cell_style),
-                Paragraph(format_number_with_decimals(row_dict.get('tb1_nil', ''), decimals), cell_style),
-                Paragraph(format_number_with_decimals(row_dict.get('tb2_nil', ''), decimals), cell_style),
-                Paragraph(format_number_with_decimals(row_dict.get('mit_nil', ''), decimals), cell_style),
-                Paragraph(qft_result, current_qft_style), # Use colored style
-                Paragraph(comment, comment_style),
-                Paragraph(str(row_dict.get('requested_date_str', '')), cell_style), # Use date string
-            ]
-            table_data.append(row_values)
+        fmt = format_number_with_decimals
+        P = Paragraph
+        search_row_values = _search_row_values
 
         # Define column widths (adjust as needed)
         col_widths = [100, 70, 45, 45, 45, 45, 50, 50, 50, 60, 65, 80] # Added session, adjusted req date
 
-        data_table = Table(table_data, colWidths=col_widths, repeatRows=1)
-
         # --- PDF Table Styling ---
-        table_style_commands = [
+        base_style_commands = [
+            ('GRID', (0, 0), (-1, -1), 0.5, reportlab_colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            # Result columns (Nil to Mit-Nil) are plain strings rather than Paragraphs: short one-line
+            # numbers don't need Paragraph's markup parsing and line breaking, which dominated layout
+            # time. Font matches cell_style; leading stays under the Paragraph cells' row height.
+            ('FONTNAME', (2, 0), (8, -1), cell_style.fontName),
+            ('FONTSIZE', (2, 0), (8, -1), cell_style.fontSize),
+        ]
+        # Header cells (including Session Name) come with the cached styles
+        column_header_table = Table([pdf_styles.header_row], colWidths=col_widths)
+        column_header_table.setStyle(TableStyle([
             ('GRID', (0, 0), (-1, -1), 0.5, reportlab_colors.grey),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -2028,25 +2392,83 @@ def export_global_search_to_pdf(results_list):
             ('BACKGROUND', (4, 0), (4, 0), reportlab_colors.Color(1.0, 0.95, 0.7)),  # TB2
             ('BACKGROUND', (5, 0), (5, 0), reportlab_colors.Color(0.85, 0.7, 0.9)),  # Mit
             ('BACKGROUND', (9, 0), (9, 0), reportlab_colors.Color(0.529, 0.808, 0.922)),# QFT
-        ]
+        ]))
 
-        # Apply row-specific background colors (text color handled by Paragraph)
-        for r_idx, row_dict in enumerate(results_list, 1):
-            qft_result = str(row_dict.get('qft_result', '')).upper()
-            comment = row_dict.get('comment', '')
-            is_wp = "WP" in comment
-            row_bg_color = None
+        # --- Page templates ---
+        # As in the main PDF export, the column header row is drawn by the page callback instead of
+        # being part of the data tables, so every page gets exactly one header row wherever the
+        # tables happen to split. The first page also carries the title and export date above it.
+        first_page_header = [Paragraph("Global Search Results", title_style),
+                             Paragraph(f"Exported: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", date_style),
+                             Spacer(1, 15),
+                             column_header_table]
+        later_page_header = [column_header_table]
+
+        def header_height(page_header):
+            height = 6 # Frame top padding
+            for flowable in page_header:
+                height += flowable.wrap(doc.width, doc.height)[1] + flowable.getSpaceAfter()
+            return height
+
+        def page_template(template_id, page_header, **kwargs):
+            """Builds a page template whose header flowables are drawn above the data frame."""
+            height = header_height(page_header)
+            def draw_page_header(canvas, doc):
+                header_frame = Frame(doc.leftMargin, doc.bottomMargin + doc.height - height,
+                                     doc.width, height, bottomPadding=0, showBoundary=0)
+                header_frame.addFromList(list(page_header), canvas)
+            body_frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height - height,
+                               topPadding=0, id=template_id + 'Body')
+            return PageTemplate(id=template_id, frames=[body_frame], onPage=draw_page_header, **kwargs)
+
+        doc.addPageTemplates([
+            page_template('First', first_page_header, autoNextPageTemplate='Later'),
+            page_template('Later', later_page_header),
+        ])
+
+        # QFT cell style and row background per row key: 'WP' for WP rows (takes precedence),
+        # otherwise the QFT result. Anything else uses the plain cell style and no background.
+        pos_bg_color = hex_to_color(current_colors['pos_bg'])
+        style_by_key = {'WP': qft_wp_style, 'POS': qft_pos_style, 'POS*': qft_pos_style,
+                        'NEG': qft_neg_style, 'IND': qft_ind_style}
+        bg_by_key = {'WP': hex_to_color(current_colors['wp_bg']), 'POS': pos_bg_color, 'POS*': pos_bg_color,
+                     'NEG': hex_to_color(current_colors['neg_bg']), 'IND': hex_to_color(current_colors['ind_bg'])}
+
+        # One big Table makes reportlab re-measure and re-split the whole thing per page,
+        # so emit fixed-size LongTables instead (no header row of their own, see the page templates)
+        rows_per_table = 40
+        total_rows = len(results_list)
+
+        def make_row_table(start):
+            """Builds the LongTable for rows start..start+rows_per_table (cells and row colors in one pass)."""
+            if start and start % 1000 == 0: # Progress every 1000 rows (25 tables), also lets Tk redraw
+                main_app.update_status(f"Exporting search results to PDF... {start}/{total_rows}", show_progress=True)
+            table_data = []
+            table_style_commands = list(base_style_commands)
+            for r_idx, row_dict in enumerate(results_list[start:start + rows_per_table]):
+                session_name, barcode, *num_cells, qft_result, comment, req_date_str = search_row_values(row_dict)
+                # Determine QFT style (comment already calculated)
+                qft_result = str(qft_result).upper()
+                row_key = 'WP' if "WP" in comment else qft_result
+
+                row_values = [P(str(session_name), cell_style), P(str(barcode), cell_style)]
+                row_values.extend([fmt(value, decimals) for value in num_cells])
+                row_values.append(P(qft_result, style_by_key.get(row_key, cell_style))) # Use colored style
+                row_values.append(P(comment, comment_style))
+                row_values.append(P(str(req_date_str), cell_style)) # Use date string
+                table_data.append(row_values)
 
-            if is_wp: row_bg_color = hex_to_color(current_colors['wp_bg'])
-            elif qft_result in ('POS', 'POS*'): row_bg_color = hex_to_color(current_colors['pos_bg'])
-            elif qft_result == 'NEG': row_bg_color = hex_to_color(current_colors['neg_bg'])
-            elif qft_result == 'IND': row_bg_color = hex_to_color(current_colors['ind_bg'])
+                row_bg_color = bg_by_key.get(row_key)
+                if row_bg_color:
+                    table_style_commands.append(('BACKGROUND', (0, r_idx), (-1, r_idx), row_bg_color))
 
-            if row_bg_color:
-                table_style_commands.append(('BACKGROUND', (0, r_idx), (-1, r_idx), row_bg_color))
+            data_table = LongTable(table_data, colWidths=col_widths)
+            data_table.setStyle(TableStyle(table_style_commands))
+            return data_table
 
-        data_table.setStyle(TableStyle(table_style_commands))
-        story.append(data_table)
+        # Same on-demand scheme as the main PDF export, so only the table being laid out holds
+        # Paragraphs instead of every search result
+        story.append(doc.row_tables(make_row_table, total_rows, rows_per_table))
 
         # --- Build PDF ---
         doc.build(story)
@@ -2056,9 +2478,7 @@ def export_global_search_to_pdf(results_list):
         # Ask to open file
         if messagebox.askyesno("Open File", "Do you want to open the exported PDF file?", parent=main_app.master):
             try:
-                if platform.system() == 'Darwin': os.system(f'open "{filename}"')
-                elif platform.system() == 'Windows': os.startfile(filename)
-                else: os.system(f'xdg-open "{filename}"')
+                open_file_with_default_app(filename)
             except Exception as open_err:
                  messagebox.showwarning("Open File Error", f"Could not automatically open the file:\n{open_err}", parent=main_app.master)
 
@@ -2079,7 +2499,10 @@ def export_global_search_to_excel(results_list):
 
     main_app.update_status("Exporting search results to Excel...", show_progress=True)
     try:
-        workbook = xlsxwriter.Workbook(filename)
+        import xlsxwriter # Loaded only when exporting
+        # constant_memory streams each finished row to disk instead of holding the whole sheet
+        # (rows are written strictly top to bottom below, which is all it requires)
+        workbook = xlsxwriter.Workbook(filename, {'constant_memory': True})
         worksheet = workbook.add_worksheet("Search Results")
 
         header_format = workbook.add_format({'bold': True, 'align': 'center', 'valign': 'vcenter', 'bg_color': '#E0E0E0', 'border': 1})
@@ -2091,34 +2514,53 @@ def export_global_search_to_excel(results_list):
         headers = ['Session', 'Barcode', 'Nil', 'TB1', 'TB2', 'Mit', 'TB1-Nil', 'TB2-Nil', 'Mit-Nil', 'QFT Result', 'Comment', 'Requested Date']
         worksheet.write_row(0, 0, headers, header_format)
 
+        # Hoist per-row lookups out of the write loop
         decimals = app_settings['decimal_places']
+        fmt = format_number_with_decimals
+        # Typed writers skip the generic write() dispatch, as in the main Excel export; write() is
+        # only kept for blanks (it turns '' into an empty cell) and non-string values
+        write = worksheet.write
+        write_string = worksheet.write_string
+        write_number = worksheet.write_number
+        write_datetime = worksheet.write_datetime
+        search_row_values = _search_row_values
+        total_rows = len(results_list)
         for r_idx, row_dict in enumerate(results_list, 1):
-            col = 0
-            worksheet.write(r_idx, col, row_dict.get('session_name',''), cell_format); col+=1
-            worksheet.write(r_idx, col, row_dict.get('barcode',''), cell_format); col+=1
-
-            num_keys = ['nil_result', 'tb1_result', 'tb2_result', 'mit_result', 'tb1_nil', 'tb2_nil', 'mit_nil']
-            for key in num_keys:
-                val_str = format_number_with_decimals(row_dict.get(key, ''), decimals)
-                # Try number conversion
-                try:
-                    if '>' in val_str or '<' in val_str or val_str.strip() == "":
-                         worksheet.write_string(r_idx, col, val_str, cell_format)
-                    else:
-                         worksheet.write_number(r_idx, col, float(val_str), cell_format)
-                except ValueError:
-                     worksheet.write_string(r_idx, col, val_str, cell_format)
-                col += 1
-
-            worksheet.write(r_idx, col, row_dict.get('qft_result',''), cell_format); col+=1
-            worksheet.write(r_idx, col, row_dict.get('comment',''), comment_format); col+=1
+            # Progress every 1000 rows (update_status also lets Tk redraw), not a per-row cost
+            if r_idx % 1000 == 0:
+                main_app.update_status(f"Exporting search results to Excel... {r_idx}/{total_rows}", show_progress=True)
+            session_name, barcode, *num_cells, qft_result, comment, req_date_str = search_row_values(row_dict)
+            for col, value in enumerate((session_name, barcode)):
+                if value and isinstance(value, str):
+                    write_string(r_idx, col, value, cell_format)
+                else:
+                    write(r_idx, col, value, cell_format)
+
+            # Numerical values (Nil to Mit-Nil): numbers go in as floats, '<'/'>' values and blanks stay strings
+            for col, value in enumerate(num_cells, 2):
+                val_str = fmt(value, decimals)
+                if '>' in val_str or '<' in val_str or val_str.strip() == "":
+                    write_string(r_idx, col, val_str, cell_format)
+                else:
+                    try:
+                        write_number(r_idx, col, float(val_str), cell_format)
+                    except ValueError:
+                        write_string(r_idx, col, val_str, cell_format)
+
+            if qft_result and isinstance(qft_result, str):
+                write_string(r_idx, 9, qft_result, cell_format)
+            else:
+                write(r_idx, 9, qft_result, cell_format)
+            if comment and isinstance(comment, str):
+                write_string(r_idx, 10, comment, comment_format)
+            else:
+                write(r_idx, 10, comment, comment_format)
             # Write date using the parsed object if available, otherwise the string
             req_date_obj = row_dict.get('requested_date_obj')
             if isinstance(req_date_obj, datetime.datetime):
-                worksheet.write_datetime(r_idx, col, req_date_obj, date_format)
+                write_datetime(r_idx, 11, req_date_obj, date_format)
             else:
-                worksheet.write(r_idx, col, row_dict.get('requested_date_str',''), cell_format) # Use the original string
-            col+=1
+                write(r_idx, 11, req_date_str, cell_format) # Use the original string
 
         # Adjust widths (adjust as needed)
         worksheet.set_column('A:A', 25) # Session
@@ -2135,9 +2577,7 @@ def export_global_search_to_excel(results_list):
         # Offer to open
         if messagebox.askyesno("Open File", "Open the exported Excel file?", parent=main_app.master):
              try:
-                 if platform.system() == 'Darwin': os.system(f'open "{filename}"')
-                 elif platform.system() == 'Windows': os.startfile(filename)
-                 else: os.system(f'xdg-open "{filename}"')
+                 open_file_with_default_app(filename)
              except Exception as open_err:
                   messagebox.showwarning("Open File Error", f"Could not automatically open the file:\n{open_err}", parent=main_app.master)
 
@@ -2161,33 +2601,35 @@ def export_global_search_to_csv(results_list):
         headers = ['Session', 'Barcode', 'Nil_Result', 'TB1_Result', 'TB2_Result', 'Mit_Result',
                    'TB1_Nil', 'TB2_Nil', 'Mit_Nil', 'QFT_Result', 'Comment', 'Requested_Date']
         decimals = app_settings['decimal_places']
+        fmt = format_number_with_decimals
+        search_row_values = _search_row_values
+
+        def csv_row(row_dict):
+            # One itemgetter call for the whole row; the date stays the string from the DB
+            session_name, barcode, *num_cells, qft_result, comment, req_date_str = search_row_values(row_dict)
+            return [session_name, barcode, *[fmt(value, decimals) for value in num_cells],
+                    qft_result, comment, req_date_str]
 
         # Use semicolon for consistency with main export if desired, or comma
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
             writer = csv.writer(csvfile, delimiter=',') # Use comma like main CSV export
             writer.writerow(headers)
-            for row_dict in results_list:
-                 row_values = [
-                     row_dict.get('session_name',''), row_dict.get('barcode',''),
-                     format_number_with_decimals(row_dict.get('nil_result', ''), decimals),
-                     format_number_with_decimals(row_dict.get('tb1_result', ''), decimals),
-                     format_number_with_decimals(row_dict.get('tb2_result', ''), decimals),
-                     format_number_with_decimals(row_dict.get('mit_result', ''), decimals),
-                     format_number_with_decimals(row_dict.get('tb1_nil', ''), decimals),
-                     format_number_with_decimals(row_dict.get('tb2_nil', ''), decimals),
-                     format_number_with_decimals(row_dict.get('mit_nil', ''), decimals),
-                     row_dict.get('qft_result',''), row_dict.get('comment',''),
-                     row_dict.get('requested_date_str','') # Use the string date from DB
-                 ]
-                 writer.writerow(row_values)
+            # writerows drives the row loop from C, rows are built lazily by map(); batches of 1000
+            # leave room for a progress update (which also lets Tk redraw) in between
+            total_rows = len(results_list)
+            for start in range(0, total_rows, 1000):
+                writer.writerows(map(csv_row, results_list[start:start + 1000]))
+                if start + 1000 < total_rows:
+                    main_app.update_status(f"Exporting search results to CSV... {start + 1000}/{total_rows}", show_progress=True)
+
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
 
         main_app.update_status("Search results exported.", hide_progress=True)
         messagebox.showinfo("Export Successful", "Search results exported to CSV.", parent=main_app.master)
         if messagebox.askyesno("Open File", "Open the exported CSV file?", parent=main_app.master):
              try:
-                 if platform.system() == 'Darwin': os.system(f'open "{filename}"')
-                 elif platform.system() == 'Windows': os.startfile(filename)
-                 else: os.system(f'xdg-open "{filename}"')
+                 open_file_with_default_app(filename)
              except Exception as open_err:
                   messagebox.showwarning("Open File Error", f"Could not automatically open the file:\n{open_err}", parent=main_app.master)
 
@@ -2244,19 +2686,22 @@ def show_manual_order_dialog():
     # Populate listbox with current data (using internal data store)
     current_ordered_data = main_app.current_data # Get the list of dicts
 
-    # Use a stable unique identifier if possible (barcode assumed unique here)
-    listbox_data_map = {} # Map listbox index to original data dictionary
+    # Data dictionaries in listbox order (listbox line i shows listbox_data_map[i])
+    listbox_data_map = list(current_ordered_data)
 
-    for i, row_dict in enumerate(current_ordered_data):
+    def display_text(row_dict):
+        """Builds the listbox line for a data row."""
         bc = str(row_dict.get('barcode', 'N/A'))
         qft = str(row_dict.get('qft_result', ''))
         req_dt = row_dict.get('requested_date')
         dt_str = req_dt.strftime('%Y-%m-%d') if isinstance(req_dt, datetime.datetime) else 'No Date'
         # Pad barcode for better alignment
-        display_text = f"{bc:<15} | {qft:<5} | {dt_str}"
-        order_listbox.insert(tk.END, display_text)
-        # Store the actual dictionary with the listbox index
-        listbox_data_map[i] = row_dict
+        return f"{bc:<15} | {qft:<5} | {dt_str}"
+
+    # Build every line first and add them with one insert (one Tcl call instead of one per row)
+    display_texts = [display_text(row_dict) for row_dict in listbox_data_map]
+    if display_texts:
+        order_listbox.insert(tk.END, *display_texts)
 
     def move_item(direction):
         selected_idx_tuple = order_listbox.curselection()
@@ -2265,21 +2710,15 @@ def show_manual_order_dialog():
 
         if direction == 'up' and current_lb_idx > 0:
             target_lb_idx = current_lb_idx - 1
-        elif direction == 'down' and current_lb_idx < order_listbox.size() - 1:
+        elif direction == 'down' and current_lb_idx < len(listbox_data_map) - 1:
             target_lb_idx = current_lb_idx + 1
         else:
             return # Cannot move further
 
-        # Swap listbox items (text)
-        current_text = order_listbox.get(current_lb_idx)
-        target_text = order_listbox.get(target_lb_idx)
+        # Swap the data dictionaries, then move the line (text rebuilt from the data, no listbox reads)
+        listbox_data_map[current_lb_idx], listbox_data_map[target_lb_idx] = listbox_data_map[target_lb_idx], listbox_data_map[current_lb_idx]
         order_listbox.delete(current_lb_idx)
-        order_listbox.insert(target_lb_idx, current_text)
-
-        # Swap the associated data dictionaries in our map
-        temp_data = listbox_data_map[current_lb_idx]
-        listbox_data_map[current_lb_idx] = listbox_data_map[target_lb_idx]
-        listbox_data_map[target_lb_idx] = temp_data
+        order_listbox.insert(target_lb_idx, display_text(listbox_data_map[target_lb_idx]))
 
         # Update selection and view
         order_listbox.selection_clear(0, tk.END)
@@ -2291,8 +2730,8 @@ def show_manual_order_dialog():
     def apply_manual_order():
             print("\n--- Inside apply_manual_order ---")
             try:
-                # Get the final order of data dictionaries from the map
-                new_data_order = [listbox_data_map[i] for i in range(order_listbox.size())]
+                # The final order of data dictionaries is kept in listbox_data_map
+                new_data_order = list(listbox_data_map)
 
                 if len(new_data_order) != len(main_app.current_data):
                     print(f"!!! ERROR: Length mismatch! Original: {len(main_app.current_data)}, New: {len(new_data_order)}")
@@ -2343,10 +2782,36 @@ def show_manual_order_dialog():
 
 
 # --- Settings/Color Customization (Keep Script 1's implementation) ---
+_HEX_COLOR_RE = re.compile(r'#[0-9A-Fa-f]{6}') # '#RRGGBB', checked without asking Tk
+
+@functools.lru_cache(maxsize=256)
+def _is_valid_tk_color(value):
+    """Checks a non-#RRGGBB color (e.g. 'red') with Tk's winfo rgb; cached, as each check is a Tcl round-trip."""
+    try:
+        main_app.master.winfo_rgb(value)
+        return True
+    except tk.TclError:
+        return False
+
+# Color picker rows of the appearance dialog: (label, settings key prefix for '<prefix>_bg'/'<prefix>_text')
+_APPEARANCE_PICKER_ROWS = (("Positive (POS)", 'pos'), ("Weak Positive (WP)", 'wp'),
+                           ("Negative (NEG)", 'neg'), ("Indeterminate (IND)", 'ind'))
+
 def customize_appearance():
     """Opens the appearance customization window (Adds WP)."""
     global main_app, app_settings
 
+    # The dialog is hidden rather than destroyed when closed, so later opens only reload
+    # the current settings into the existing widgets instead of building them all again
+    cached_dialog = main_app.appearance_dialog
+    if cached_dialog and cached_dialog[0].winfo_exists():
+        custom_window, load_current_settings = cached_dialog
+        load_current_settings()
+        main_app.center_window(custom_window, 450, 430)
+        custom_window.deiconify()
+        custom_window.grab_set()
+        return
+
     custom_window = tk.Toplevel(main_app.master)
     custom_window.title("Customize Appearance")
     custom_window.geometry("450x430")
@@ -2355,33 +2820,28 @@ def customize_appearance():
     custom_window.configure(bg=app_settings.get('dialog_bg', '#F5F5F5'))
     main_app.center_window(custom_window, 450, 430)
 
-    # --- Variables (remain the same) ---
-    pos_bg_var = tk.StringVar(value=app_settings.get('pos_bg','#FFFFE0'))
-    neg_bg_var = tk.StringVar(value=app_settings.get('neg_bg','#FFFFFF'))
-    ind_bg_var = tk.StringVar(value=app_settings.get('ind_bg','#FFFFFF'))
-    wp_bg_var = tk.StringVar(value=app_settings.get('wp_bg','#FFF8DC'))
-    pos_text_var = tk.StringVar(value=app_settings.get('pos_text','#e53935'))
-    neg_text_var = tk.StringVar(value=app_settings.get('neg_text','#43a047'))
-    ind_text_var = tk.StringVar(value=app_settings.get('ind_text','#fb8c00'))
-    wp_text_var = tk.StringVar(value=app_settings.get('wp_text','#D2691E'))
+    # --- Variables ---
+    # Colors are plain Python state: only the pickers and Reset change them, and those update
+    # the previews directly (no Tcl variables or traces needed)
+    color_state = {key: app_settings.get(key, _DEFAULT_SETTINGS[key]) for key in _TAG_COLOR_KEYS}
+    color_previews = {} # Setting key -> (preview label, label option showing the color)
     decimal_var = tk.StringVar(value=str(app_settings.get('decimal_places','default')))
 
     # --- Frames (remain the same) ---
     main_options_frame = ttk.Frame(custom_window, style='Dialog.TFrame')
     main_options_frame.pack(pady=10, padx=15, fill='both', expand=True)
     ttk.Label(main_options_frame, text="Result Highlighting", style='DialogSubtitle.TLabel').pack(anchor='w', pady=(0, 5))
-    preview_widgets = {}
 
     # --- Helper to create color pickers (MODIFIED LAYOUT) ---
-    def create_color_picker(parent, text, bg_var, text_var, preview_id):
+    def create_color_picker(parent, text, preview_id):
+        bg_key, text_key = f'{preview_id}_bg', f'{preview_id}_text'
         # Main frame for this row
         row_frame = ttk.Frame(parent, style='Dialog.TFrame', padding=(0, 2)) # Add vertical padding between rows
         row_frame.pack(fill='x')
 
         # Configure columns for Label, BG controls, Text controls
+        # (the two control columns keep grid's default weight of 0, so only the label column needs a call)
         row_frame.grid_columnconfigure(0, weight=1, minsize=130) # Label column - allow expanding, give min size
-        row_frame.grid_columnconfigure(1, weight=0) # BG Controls column
-        row_frame.grid_columnconfigure(2, weight=0) # Text Controls column
 
         # --- Label ---
         label = ttk.Label(row_frame, text=f"{text}:", style='Dialog.TLabel')
@@ -2391,43 +2851,44 @@ def customize_appearance():
         bg_controls_frame = ttk.Frame(row_frame, style='Dialog.TFrame')
         bg_controls_frame.grid(row=0, column=1, sticky='w') # Place in column 1
 
-        bg_preview = tk.Label(bg_controls_frame, width=2, height=1, bg=bg_var.get(), relief='solid', borderwidth=1)
+        bg_preview = tk.Label(bg_controls_frame, width=2, height=1, bg=color_state[bg_key], relief='solid', borderwidth=1)
         bg_preview.pack(side='left', padx=(0, 2)) # Pack tightly left
 
         bg_button = ttk.Button(bg_controls_frame, text="BG Color", width=8, style='SmallDialog.TButton',
-                              command=lambda v=bg_var, p=bg_preview: choose_color(v, p))
+                              command=lambda: choose_color(bg_key))
         bg_button.pack(side='left') # Pack next to preview
 
         # --- Text Controls Sub-Frame ---
         text_controls_frame = ttk.Frame(row_frame, style='Dialog.TFrame')
         text_controls_frame.grid(row=0, column=2, sticky='w', padx=(10, 0)) # Place in column 2, pad left
 
-        text_preview = tk.Label(text_controls_frame, text="Text", width=4, height=1, fg=text_var.get(), bg='white', relief='solid', borderwidth=1)
+        text_preview = tk.Label(text_controls_frame, text="Text", width=4, height=1, fg=color_state[text_key], bg='white', relief='solid', borderwidth=1)
         text_preview.pack(side='left', padx=(0, 2)) # Pack tightly left
 
         text_button = ttk.Button(text_controls_frame, text="Text Color", width=9, style='SmallDialog.TButton',
-                                command=lambda v=text_var, p=text_preview: choose_color(v, p, is_text=True))
+                                command=lambda: choose_color(text_key, is_text=True))
         text_button.pack(side='left') # Pack next to preview
 
-        # Store preview labels for live update (no change)
-        preview_widgets[preview_id] = {'bg': bg_preview, 'text': text_preview}
-        bg_var.trace_add('write', lambda name, index, mode, p=bg_preview, v=bg_var: p.config(bg=v.get()))
-        text_var.trace_add('write', lambda name, index, mode, p=text_preview, v=text_var: p.config(fg=v.get()))
+        # Store preview labels for live update
+        color_previews[bg_key] = (bg_preview, 'bg')
+        color_previews[text_key] = (text_preview, 'fg')
 
-    def choose_color(color_var, preview_label, is_text=False):
-        # ... (choose_color function remains the same) ...
+    def set_color(key, color):
+        """Stores a picked color and shows it in its preview label."""
+        color_state[key] = color
+        preview_label, option = color_previews[key]
+        preview_label.config({option: color})
+
+    def choose_color(key, is_text=False):
         title = "Choose Text Color" if is_text else "Choose Background Color"
-        initial_color = color_var.get()
-        result = colorchooser.askcolor(color=initial_color, title=title, parent=custom_window)
+        result = colorchooser.askcolor(color=color_state[key], title=title, parent=custom_window)
         new_color_hex = result[1] # Get the hex string
         if new_color_hex: # If a color was chosen
-            color_var.set(new_color_hex)
+            set_color(key, new_color_hex)
 
-    # --- Create pickers including WP (call remains the same) ---
-    create_color_picker(main_options_frame, "Positive (POS)", pos_bg_var, pos_text_var, 'pos')
-    create_color_picker(main_options_frame, "Weak Positive (WP)", wp_bg_var, wp_text_var, 'wp')
-    create_color_picker(main_options_frame, "Negative (NEG)", neg_bg_var, neg_text_var, 'neg')
-    create_color_picker(main_options_frame, "Indeterminate (IND)", ind_bg_var, ind_text_var, 'ind')
+    # --- Create pickers including WP ---
+    for text, preview_id in _APPEARANCE_PICKER_ROWS:
+        create_color_picker(main_options_frame, text, preview_id)
 
     # --- Separator, Decimal Places, Action Buttons (remain the same) ---
     ttk.Separator(main_options_frame, orient='horizontal').pack(fill='x', pady=10)
@@ -2445,53 +2906,160 @@ def customize_appearance():
     # ... (apply_settings, reset_to_defaults functions remain the same) ...
     def apply_settings():
         global app_settings
-        new_settings = {
-            'pos_bg': pos_bg_var.get(), 'neg_bg': neg_bg_var.get(), 'ind_bg': ind_bg_var.get(), 'wp_bg': wp_bg_var.get(),
-            'pos_text': pos_text_var.get(), 'neg_text': neg_text_var.get(), 'ind_text': ind_text_var.get(), 'wp_text': wp_text_var.get(),
-            'decimal_places': decimal_var.get()
-        }
+        new_settings = dict(color_state, decimal_places=decimal_var.get())
         for key, val in new_settings.items():
-             if ('bg' in key or 'text' in key) and not (val.startswith('#') and len(val) == 7):
-                  try:
-                       custom_window.winfo_rgb(val)
-                  except tk.TclError:
+             if ('bg' in key or 'text' in key) and not _HEX_COLOR_RE.fullmatch(val):
+                  if not _is_valid_tk_color(val):
                        messagebox.showerror("Invalid Color", f"Invalid color format for {key}: '{val}'.\nPlease use #RRGGBB format.", parent=custom_window)
                        return
+        # Apply with nothing edited: keep the saved file and the results view as they are
+        if {key: app_settings.get(key) for key in new_settings} == new_settings:
+            hide_window()
+            return
+        decimals_changed = new_settings['decimal_places'] != app_settings.get('decimal_places')
         app_settings = new_settings
         save_settings(app_settings)
-        main_app.apply_styles()
-        main_app.refresh_display()
-        custom_window.destroy()
+        main_app.apply_styles() # Re-colors the row/QFT tags; text already carrying them repaints by itself
+        # Only a new decimal setting changes the displayed text, so only then rebuild the results
+        if decimals_changed:
+            main_app.refresh_display()
+        hide_window()
         main_app.update_status("Appearance settings applied.")
 
     def reset_to_defaults():
-        defaults = {
-            'pos_bg': '#FFFFE0', 'neg_bg': '#FFFFFF', 'ind_bg': '#FFFFFF', 'wp_bg': '#FFF8DC',
-            'pos_text': '#e53935', 'neg_text': '#43a047', 'ind_text': '#fb8c00', 'wp_text': '#D2691E',
-            'decimal_places': 'default'
-        }
-        pos_bg_var.set(defaults['pos_bg'])
-        neg_bg_var.set(defaults['neg_bg'])
-        ind_bg_var.set(defaults['ind_bg'])
-        wp_bg_var.set(defaults['wp_bg'])
-        pos_text_var.set(defaults['pos_text'])
-        neg_text_var.set(defaults['neg_text'])
-        ind_text_var.set(defaults['ind_text'])
-        wp_text_var.set(defaults['wp_text'])
+        defaults = _DEFAULT_SETTINGS
+        for key in _TAG_COLOR_KEYS:
+            set_color(key, defaults[key])
         decimal_var.set(defaults['decimal_places'])
 
+    def load_current_settings():
+        """Shows the saved settings again when the hidden dialog is reopened (discards unapplied picks)."""
+        for key in _TAG_COLOR_KEYS:
+            set_color(key, app_settings.get(key, _DEFAULT_SETTINGS[key]))
+        decimal_var.set(str(app_settings.get('decimal_places','default')))
+
+    def hide_window():
+        custom_window.grab_release()
+        custom_window.withdraw()
+
     reset_button = ttk.Button(button_frame, text="Reset Defaults", style='DialogAlt.TButton', command=reset_to_defaults)
     reset_button.pack(side='left', padx=5)
-    cancel_button = ttk.Button(button_frame, text="Cancel", style='DialogAlt.TButton', command=custom_window.destroy)
+    cancel_button = ttk.Button(button_frame, text="Cancel", style='DialogAlt.TButton', command=hide_window)
     cancel_button.pack(side='right', padx=5)
     apply_button = ttk.Button(button_frame, text="Apply Settings", style='DialogHighlight.TButton', command=apply_settings)
     apply_button.pack(side='right', padx=5)
 
+    custom_window.protocol("WM_DELETE_WINDOW", hide_window) # Closing just hides it too
+    main_app.appearance_dialog = (custom_window, load_current_settings)
+
+# --- ttk Styles (applied by QFTApp.setup_styles) ---
+# Color Palette (Use S2's general feel)
+_PRIMARY_COLOR = "#2196F3" # S2 Blue
+_SECONDARY_COLOR = "#f0f2f5" # S2 Background
+_TEXT_COLOR = "#333333"
+_ALT_BUTTON_BG = "#DCDCDC" # Light grey for less prominent buttons
+_ALT_BUTTON_FG = "#333333"
+_DIALOG_BG = '#F5F5F5'
+_STATUS_FG = '#666666' # S2 Subtitle color
+
+# (style name, configure options) for the main window and splash screen, applied at startup
+_TTK_STYLES = (
+    # --- Base Styles ---
+    ('.', dict(font=('Open Sans', 10), background=_SECONDARY_COLOR, foreground=_TEXT_COLOR)), # S2 Font
+    ('TFrame', dict(background=_SECONDARY_COLOR)),
+    ('TLabel', dict(background=_SECONDARY_COLOR, foreground=_TEXT_COLOR, padding=5)),
+    # Button style from S2
+    ('Custom.TButton', dict(font=('Open Sans', 11, 'bold'), padding=(25, 12), background=_PRIMARY_COLOR, foreground='white')),
+    # Alt button style (for less prominent buttons like Clear/Cancel)
+    ('Alt.TButton', dict(font=('Open Sans', 11, 'bold'), padding=(25, 12), background=_ALT_BUTTON_BG, foreground=_ALT_BUTTON_FG)),
+
+    # --- Specific Styles from S2 GUI Structure ---
+    ('Title.TLabel', dict(font=('Open Sans', 32, 'bold'), foreground='#1976D2', background=_SECONDARY_COLOR)),
+    ('Subtitle.TLabel', dict(font=('Open Sans', 10), foreground=_STATUS_FG, background=_SECONDARY_COLOR)), # Smaller subtitle font
+
+    # Sort/Search Controls Styles from S2
+    ('Sort.TLabel', dict(font=('Open Sans', 10), background=_SECONDARY_COLOR, foreground=_STATUS_FG)),
+    ('Sort.TCombobox', dict(padding=5)),
+    ('Search.TEntry', dict(padding=5, fieldbackground='white')),
+    ('Search.TButton', dict(font=('Open Sans', 9), padding=(5, 3))), # Smaller search buttons
+
+    # Status Bar Style
+    ('Status.TFrame', dict(background=_SECONDARY_COLOR)), # Match main background
+    ('Status.TLabel', dict(background=_SECONDARY_COLOR, foreground=_STATUS_FG, font=('Open Sans', 9))),
+
+    # Splash screen styles (the splash is already on screen, so these can't wait)
+    ('Splash.TFrame', dict(background='#FFFFFF')),
+    ('Splash.TLabel', dict(background='#FFFFFF', foreground=_TEXT_COLOR)),
+)
+
+# Styles only used by dialogs and their Treeviews; applied once the main window has been drawn
+_TTK_DIALOG_STYLES = (
+    # Export dialog header/description styles (used by the export option dialogs)
+    ('DialogHeader.TLabel', dict(font=('Open Sans', 16, 'bold'), foreground='#1976D2', background=_SECONDARY_COLOR)),
+    ('DialogDesc.TLabel', dict(font=('Open Sans', 9), foreground=_STATUS_FG, background=_SECONDARY_COLOR)),
+
+    # Dialog styles (Keep S1's setup for consistency in dialogs)
+    ('Dialog.TFrame', dict(background=_DIALOG_BG)),
+    ('Dialog.TLabel', dict(background=_DIALOG_BG, foreground=_TEXT_COLOR)),
+    ('DialogTitle.TLabel', dict(font=('Segoe UI', 14, 'bold'), background=_DIALOG_BG, foreground='#1976D2')), # Use S2 blue
+    ('DialogSubtitle.TLabel', dict(font=('Segoe UI', 10, 'italic'), background=_DIALOG_BG, foreground=_STATUS_FG)),
+    ('DialogStatus.TLabel', dict(font=('Segoe UI', 9), background=_DIALOG_BG, foreground=_STATUS_FG)),
+    ('Dialog.TButton', dict(font=('Segoe UI', 10), padding=(10, 6))),
+    ('SmallDialog.TButton', dict(font=('Segoe UI', 9), padding=(5, 3))),
+    ('DialogAlt.TButton', dict(font=('Segoe UI', 10), padding=(10, 6), background=_ALT_BUTTON_BG, foreground=_ALT_BUTTON_FG)),
+    ('DialogHighlight.TButton', dict(font=('Segoe UI', 10, 'bold'), padding=(10, 6), background='#28A745', foreground='white')),
+    ('Dialog.TEntry', dict(padding=5, fieldbackground='white')),
+    ('Dialog.TCombobox', dict(padding=5)),
+
+    # Treeview styling (Keep S1's for Session/Global Search)
+    ('Treeview', dict(rowheight=25, font=('Segoe UI', 9), fieldbackground='white')),
+    ('Treeview.Heading', dict(font=('Segoe UI', 10, 'bold'), padding=5)),
+)
+
+# (style name, state-dependent map options), split the same way
+_TTK_STYLE_MAPS = (
+    ('Custom.TButton', dict(background=[('active', '#1976D2'), ('disabled', '#BDBDBD')], # Darker blue on active
+                            foreground=[('disabled', '#757575')])),
+    ('Alt.TButton', dict(background=[('active', '#C8C8C8')])),
+    ('Sort.TCombobox', dict(fieldbackground=[('readonly', 'white')])),
+)
+_TTK_DIALOG_STYLE_MAPS = (
+    ('DialogAlt.TButton', dict(background=[('active', '#C8C8C8')])),
+    ('DialogHighlight.TButton', dict(background=[('active', '#218838')])),
+    ('Dialog.TCombobox', dict(fieldbackground=[('readonly', 'white')])),
+    ('Treeview', dict(background=[('selected', '#0078D4')], foreground=[('selected', 'white')])),
+)
+
 # ... (Rest of the script remains the same) ...
 # --- Main Application Class ---
 
 class QFTApp:
     """Main application class (Using Script 1's structure, adapted GUI)."""
+
+    # Define column structure (used for Text widget formatting) - Adjust widths to match S2 look
+    # Widths below are approximate character counts for Consolas font. These never change,
+    # so they live on the class and are shared instead of being rebuilt in __init__.
+    headers_info = (
+         ("Barcode", 'header_base', 12),    # S2: 12
+         ("Nil_Result", 'header_nil', 12),  # S2: 12
+         ("TB1_Result", 'header_tb1', 12),  # S2: 12
+         ("TB2_Result", 'header_tb2', 12),  # S2: 12
+         ("Mit_Result", 'header_mit', 12),  # S2: 12
+         ("TB1_Nil", 'header_tb1', 12),     # S2: 12
+         ("TB2_Nil", 'header_tb2', 12),     # S2: 12
+         ("Mit_Nil", 'header_mit', 12),     # S2: 12
+         ("QFT_Result", 'header_qft', 8),   # S2: 8
+         ("Comment", 'header_comment', 15), # Added for comment display
+         ("Request Date", 'header_base', 19) # Added for date display (plain header background)
+    )
+    total_width = sum(w for _, _, w in headers_info) + len(headers_info) # Approx total width
+    column_widths = tuple(w for _, _, w in headers_info) # Fixed, so refresh_display doesn't rebuild it
+    # printf-style cell templates: '%-W.Ws' pads AND cuts a value to its column width in one C-level step
+    column_formats = tuple('%%-%d.%ds' % (w, w) for _, _, w in headers_info)
+    # Row background tag and QFT cell text-color tag by row key ('WP' first, else the QFT result)
+    row_tag_by_key = {'WP': 'wp_row', 'POS': 'pos_row', 'POS*': 'pos_row', 'NEG': 'neg_row', 'IND': 'ind_row'}
+    qft_tag_by_key = {'WP': 'qft_wp', 'POS': 'qft_pos', 'POS*': 'qft_pos', 'NEG': 'qft_neg', 'IND': 'qft_ind'}
+
     def __init__(self, master):
         self.master = master
         self.master.title("QFT-Plus Data Viewer v2.1") # Updated version
@@ -2499,28 +3067,16 @@ class QFTApp:
         self.master.minsize(1000, 700) # Min size from S2
         self.master.configure(background='#f0f2f5') # Background from S2
 
-        # Define column structure (used for Text widget formatting) - Adjust widths to match S2 look
-        # Widths below are approximate character counts for Consolas font
-        self.headers_info = [
-             ("Barcode", 'header_base', 12),    # S2: 12
-             ("Nil_Result", 'header_nil', 12),  # S2: 12
-             ("TB1_Result", 'header_tb1', 12),  # S2: 12
-             ("TB2_Result", 'header_tb2', 12),  # S2: 12
-             ("Mit_Result", 'header_mit', 12),  # S2: 12
-             ("TB1_Nil", 'header_tb1', 12),     # S2: 12
-             ("TB2_Nil", 'header_tb2', 12),     # S2: 12
-             ("Mit_Nil", 'header_mit', 12),     # S2: 12
-             ("QFT_Result", 'header_qft', 8),   # S2: 8
-             ("Comment", 'header_comment', 15), # Added for comment display
-             ("Request Date", 'header_base', 19) # Added for date display
-         ]
-        self.total_width = sum(w for _, _, w in self.headers_info) + len(self.headers_info) # Approx total width
-
         # --- Global App State ---
         self.current_data = [] # List of dictionaries, canonical data store
+        self.header_segments = self._build_header_segments() # Fixed header block inserted by refresh_display
+        self._row_meta = {} # id(row) -> display metadata of that row, see _display_row_meta
+        self._search_barcodes = None # Displayed barcodes, lowercased for search (built on the first search after a refresh)
         self.imported_filename_source = "" # Track origin (filename or session)
         self.current_sort_column = 'requested_date' # Default sort (matches S2 initial sort)
         self.current_sort_direction = 'asc'         # Default sort (matches S2 initial sort)
+        self.appearance_dialog = None # (window, reload callback) once Customize Appearance has been opened
+        self.screen_size = None # (width, height), filled in by the first center_window call
 
         # Load settings early
         global app_settings
@@ -2552,8 +3108,10 @@ class QFTApp:
         window_instance.update_idletasks() # Ensure dimensions are calculated
         w = width or window_instance.winfo_width()
         h = height or window_instance.winfo_height()
-        sw = window_instance.winfo_screenwidth()
-        sh = window_instance.winfo_screenheight()
+        # The screen size doesn't change while the app runs, so it is only asked for once
+        if self.screen_size is None:
+            self.screen_size = (window_instance.winfo_screenwidth(), window_instance.winfo_screenheight())
+        sw, sh = self.screen_size
         x = (sw // 2) - (w // 2)
         y = (sh // 2) - (h // 2)
         window_instance.geometry(f'{w}x{h}+{x}+{y}')
@@ -2563,78 +3121,38 @@ class QFTApp:
         self.style = ttk.Style()
         self.style.theme_use('clam') # Consistent theme
 
-        # --- Color Palette (Use S2's general feel) ---
-        primary_color = "#2196F3" # S2 Blue
-        secondary_color = "#f0f2f5" # S2 Background
-        text_color = "#333333"
-        alt_button_bg = "#DCDCDC" # Light grey for less prominent buttons
-        alt_button_fg = "#333333"
-        dialog_bg = '#F5F5F5'
-        status_fg = '#666666' # S2 Subtitle color
-
-        # --- Base Styles ---
-        self.style.configure('.', font=('Open Sans', 10), background=secondary_color, foreground=text_color) # S2 Font
-        self.style.configure('TFrame', background=secondary_color)
-        self.style.configure('TLabel', background=secondary_color, foreground=text_color, padding=5)
-        # Button style from S2
-        self.style.configure('Custom.TButton', font=('Open Sans', 11, 'bold'), padding=(25, 12),
-                             background=primary_color, foreground='white')
-        self.style.map('Custom.TButton',
-                       background=[('active', '#1976D2'), ('disabled', '#BDBDBD')], # Darker blue on active
-                       foreground=[('disabled', '#757575')])
-        # Alt button style (for less prominent buttons like Clear/Cancel)
-        self.style.configure('Alt.TButton', font=('Open Sans', 11, 'bold'), padding=(25, 12),
-                             background=alt_button_bg, foreground=alt_button_fg)
-        self.style.map('Alt.TButton', background=[('active', '#C8C8C8')])
-
-        # --- Specific Styles from S2 GUI Structure ---
-        self.style.configure('Title.TLabel', font=('Open Sans', 32, 'bold'), foreground='#1976D2', background=secondary_color)
-        self.style.configure('Subtitle.TLabel', font=('Open Sans', 10), foreground=status_fg, background=secondary_color) # Smaller subtitle font
-
-        # Sort/Search Controls Styles from S2
-        self.style.configure('Sort.TLabel', font=('Open Sans', 10), background=secondary_color, foreground=status_fg)
-        self.style.configure('Sort.TCombobox', padding=5)
-        self.style.map('Sort.TCombobox', fieldbackground=[('readonly', 'white')])
-        self.style.configure('Search.TEntry', padding=5, fieldbackground='white')
-        self.style.configure('Search.TButton', font=('Open Sans', 9), padding=(5, 3)) # Smaller search buttons
-
-        # Status Bar Style
-        self.style.configure('Status.TFrame', background=secondary_color) # Match main background
-        self.style.configure('Status.TLabel', background=secondary_color, foreground=status_fg, font=('Open Sans', 9))
-
-        # Dialog styles (Keep S1's setup for consistency in dialogs)
-        self.style.configure('Dialog.TFrame', background=dialog_bg)
-        self.style.configure('Dialog.TLabel', background=dialog_bg, foreground=text_color)
-        self.style.configure('DialogTitle.TLabel', font=('Segoe UI', 14, 'bold'), background=dialog_bg, foreground='#1976D2') # Use S2 blue
-        self.style.configure('DialogSubtitle.TLabel', font=('Segoe UI', 10, 'italic'), background=dialog_bg, foreground=status_fg)
-        self.style.configure('DialogStatus.TLabel', font=('Segoe UI', 9), background=dialog_bg, foreground=status_fg)
-        self.style.configure('Dialog.TButton', font=('Segoe UI', 10), padding=(10, 6))
-        self.style.configure('SmallDialog.TButton', font=('Segoe UI', 9), padding=(5, 3))
-        self.style.configure('DialogAlt.TButton', font=('Segoe UI', 10), padding=(10, 6), background=alt_button_bg, foreground=alt_button_fg)
-        self.style.map('DialogAlt.TButton', background=[('active', '#C8C8C8')])
-        self.style.configure('DialogHighlight.TButton', font=('Segoe UI', 10, 'bold'), padding=(10, 6), background='#28A745', foreground='white')
-        self.style.map('DialogHighlight.TButton', background=[('active', '#218838')])
-        self.style.configure('Dialog.TEntry', padding=5, fieldbackground='white')
-        self.style.configure('Dialog.TCombobox', padding=5)
-        self.style.map('Dialog.TCombobox', fieldbackground=[('readonly', 'white')])
-
-        # Splash screen styles
-        self.style.configure('Splash.TFrame', background='#FFFFFF')
-        self.style.configure('Splash.TLabel', background='#FFFFFF', foreground=text_color)
-
-        # Treeview styling (Keep S1's for Session/Global Search)
-        self.style.configure("Treeview", rowheight=25, font=('Segoe UI', 9), fieldbackground='white')
-        self.style.configure("Treeview.Heading", font=('Segoe UI', 10, 'bold'), padding=5)
-        self.style.map("Treeview", background=[('selected', '#0078D4')], foreground=[('selected', 'white')])
+        self._apply_style_tables(_TTK_STYLES, _TTK_STYLE_MAPS)
+        # Dialog styles aren't needed until the user opens a dialog, so the main window paints first
+        self.master.after_idle(self.setup_dialog_styles)
+
+    def setup_dialog_styles(self):
+        """Configure the ttk styles used only by dialogs (scheduled by setup_styles)."""
+        self._apply_style_tables(_TTK_DIALOG_STYLES, _TTK_DIALOG_STYLE_MAPS)
+
+    def _apply_style_tables(self, styles, style_maps):
+        """One pass over a pair of style tables (see _TTK_STYLES), with the bound methods looked up once."""
+        configure = self.style.configure
+        for style_name, options in styles:
+            configure(style_name, **options)
+        style_map = self.style.map
+        for style_name, options in style_maps:
+            style_map(style_name, **options)
 
     def apply_styles(self):
         """Apply loaded/current settings to widget styles where needed."""
+        # Resolve the highlight colors once per settings change (defaults for any missing key)
+        self._tag_colors = {key: app_settings.get(key, _DEFAULT_SETTINGS[key]) for key in _TAG_COLOR_KEYS}
         # Primarily for Text widget tags based on settings
         self.configure_text_tags()
 
     def configure_text_tags(self):
         """Configure tags for the results Text widget based on settings."""
         if not hasattr(self, 'results_text'): return # Widget not created yet
+        # Applying settings that leave the colors alone (e.g. only decimal places) needs no Tcl calls:
+        # the fixed tags never change and the color tags are still set from last time
+        tag_colors = self._tag_colors
+        tag_signature = tuple(tag_colors.values())
+        if tag_signature == getattr(self, '_last_tag_signature', None): return
 
         # Header tags (fixed colors like S2)
         self.results_text.tag_configure('header_base', font=('Consolas', 11, 'bold'), background='#f0f2f5')
@@ -2645,21 +3163,22 @@ class QFTApp:
         self.results_text.tag_configure('header_qft', font=('Consolas', 11, 'bold'), background='#87CEEB')
         self.results_text.tag_configure('header_comment', font=('Consolas', 11, 'bold'), background='#E0E0E0')
 
-        # Data row tags (using settings) - Background applied to whole row
-        self.results_text.tag_configure('pos_row', background=app_settings.get('pos_bg','#FFFFE0'))
-        self.results_text.tag_configure('neg_row', background=app_settings.get('neg_bg','#FFFFFF'))
-        self.results_text.tag_configure('ind_row', background=app_settings.get('ind_bg','#FFFFFF'))
-        self.results_text.tag_configure('wp_row', background=app_settings.get('wp_bg','#FFF8DC')) # Added WP row BG
+        # Data row tags (using the colors resolved in apply_styles) - Background applied to whole row
+        self.results_text.tag_configure('pos_row', background=tag_colors['pos_bg'])
+        self.results_text.tag_configure('neg_row', background=tag_colors['neg_bg'])
+        self.results_text.tag_configure('ind_row', background=tag_colors['ind_bg'])
+        self.results_text.tag_configure('wp_row', background=tag_colors['wp_bg']) # Added WP row BG
 
         # Specific cell tags (primarily for QFT result text color)
-        self.results_text.tag_configure('qft_pos', foreground=app_settings.get('pos_text','#e53935'))
-        self.results_text.tag_configure('qft_neg', foreground=app_settings.get('neg_text','#43a047'))
-        self.results_text.tag_configure('qft_ind', foreground=app_settings.get('ind_text','#fb8c00'))
-        self.results_text.tag_configure('qft_wp', foreground=app_settings.get('wp_text','#D2691E')) # Added WP text color
+        self.results_text.tag_configure('qft_pos', foreground=tag_colors['pos_text'])
+        self.results_text.tag_configure('qft_neg', foreground=tag_colors['neg_text'])
+        self.results_text.tag_configure('qft_ind', foreground=tag_colors['ind_text'])
+        self.results_text.tag_configure('qft_wp', foreground=tag_colors['wp_text']) # Added WP text color
         # Comment tag
         self.results_text.tag_configure('comment', font=('Consolas', 10, 'italic'), foreground='#666666')
         # Search highlight tag
         self.results_text.tag_configure('search_highlight', background='yellow', foreground='black')
+        self._last_tag_signature = tag_signature
 
     def create_menu(self):
         """Create the main application menu bar (Adapted from S2 for structure)."""
@@ -2728,22 +3247,34 @@ class QFTApp:
         self.master.bind_all("<Control-l>", lambda e: manage_sessions())
         self.master.bind_all("<Control-m>", lambda e: show_manual_order_dialog())
         self.master.bind_all("<Control-f>", lambda e: show_global_search())
-        # Ctrl+A handled by _handle_select_all
+        # Ctrl+A in text fields: class bindings, so Tk hands over the widget directly (no focus lookup);
+        # the Edit > Select All menu item goes through _handle_select_all
+        for widget_class in ('Text', 'Entry', 'TEntry'):
+            self.master.bind_class(widget_class, '<Control-a>', self._select_all_event)
+            self.master.bind_class(widget_class, '<Control-A>', self._select_all_event)
 
     def _handle_select_all(self, event=None):
         """Helper to call SelectAll on the currently focused widget."""
         try:
-            widget = self.master.focus_get()
-            if isinstance(widget, tk.Text):
-                widget.tag_add(tk.SEL, "1.0", tk.END)
-                widget.mark_set(tk.INSERT, "1.0")
-                widget.see(tk.INSERT)
-            elif isinstance(widget, ttk.Entry) or isinstance(widget, tk.Entry):
-                 widget.select_range(0, tk.END)
-                 widget.icursor(tk.END)
+            self._select_all_in(self.master.focus_get())
         except Exception as e:
             print(f"Select All error: {e}")
 
+    def _select_all_event(self, event):
+        """Ctrl+A binding for Text/Entry widgets."""
+        self._select_all_in(event.widget)
+        return 'break' # Replaces Tk's default Ctrl+A (move to line start)
+
+    def _select_all_in(self, widget):
+        """Selects all text in a Text or Entry widget (other widgets are ignored)."""
+        if isinstance(widget, tk.Text):
+            widget.tag_add(tk.SEL, "1.0", tk.END)
+            widget.mark_set(tk.INSERT, "1.0")
+            widget.see(tk.INSERT)
+        elif isinstance(widget, ttk.Entry) or isinstance(widget, tk.Entry):
+             widget.select_range(0, tk.END)
+             widget.icursor(tk.END)
+
     def update_decimal_menu(self):
         """Updates the View > Decimal Places menu."""
         self.decimal_menu.delete(0, tk.END) # Clear existing items
@@ -2757,13 +3288,14 @@ class QFTApp:
         if not hasattr(self, 'decimal_var_menu'):
              self.decimal_var_menu = tk.StringVar(value=str(current_setting))
 
+        indicator_color = self.style.lookup('TCheckbutton', 'indicatorcolor') # Match theme indicator (one lookup for all items)
         for label, value in options.items():
             self.decimal_menu.add_radiobutton(
                 label=label,
                 variable=self.decimal_var_menu, # Use the class variable
                 value=str(value),
                 command=lambda v=value: self.set_decimal_places(v),
-                selectcolor=self.style.lookup('TCheckbutton', 'indicatorcolor') # Match theme indicator
+                selectcolor=indicator_color
             )
         # Ensure the menu variable reflects the actual current setting
         self.decimal_var_menu.set(str(current_setting))
@@ -2900,46 +3432,22 @@ class QFTApp:
         if list_of_dicts:
              print(f"Sample received record (raw): {list_of_dicts[0]}")
 
-        processed_rows = []
-        required_keys = ['barcode', 'nil_result', 'tb1_result', 'tb2_result', 'mit_result', 'tb1_nil', 'tb2_nil', 'mit_nil', 'qft_result', 'requested_date']
-
-        for i, row in enumerate(list_of_dicts):
-            processed_row = {}
-            # Ensure essential keys exist, default to empty string or None
-            for key in required_keys:
-                processed_row[key] = str(row.get(key, '')) # Convert all to string initially
+        text_keys = _NUM_KEYS + ('qft_result',) # Stored as str; barcode and date are handled separately
 
+        def process_row(row):
+            g = row.get
             # Handle potential case difference from import rename mapping
-            processed_row['barcode'] = str(row.get('barcode', row.get('Barcode', '')))
-            processed_row['requested_date'] = row.get('requested_date', row.get('RequestedDate')) # Keep original type for now
-
-            # Process the date specifically
-            date_val = processed_row['requested_date']
-            parsed_date = None
-            if isinstance(date_val, datetime.datetime):
-                 parsed_date = date_val # Already correct type
-            elif isinstance(date_val, str):
-                try:
-                    # Attempt parsing from expected DB format first if loading session
-                    parsed_date = datetime.datetime.strptime(date_val, '%Y-%m-%d %H:%M:%S')
-                except (ValueError, TypeError):
-                    try:
-                         # Attempt parsing from import format '%d/%m/%Y %H:%M:%S'
-                         parsed_date = datetime.datetime.strptime(date_val, '%d/%m/%Y %H:%M:%S')
-                    except (ValueError, TypeError):
-                         print(f"Warning: Could not parse date string '{date_val}' for barcode {processed_row['barcode']}. Setting to None.")
-                         parsed_date = None # Failed parsing string
-            elif pd.isna(date_val): # Handle Pandas NaT
-                 parsed_date = None
-            else:
-                 # If it's None, or some other non-string/non-datetime type
-                 parsed_date = None
-
-            processed_row['requested_date'] = parsed_date # Assign the parsed datetime object or None
-
-            processed_rows.append(processed_row)
-            # if i < 5: # Print first few processed rows
-            #      print(f"Processed row {i}: {processed_row}")
+            barcode = str(g('barcode', g('Barcode', '')))
+            date_val = g('requested_date', g('RequestedDate'))
+            parsed_date = _parse_requested_date(date_val) # datetime object or None
+            if parsed_date is None and isinstance(date_val, str):
+                print(f"Warning: Could not parse date string '{date_val}' for barcode {barcode}. Setting to None.")
+            processed_row = {'barcode': barcode}
+            processed_row.update({key: str(g(key, '')) for key in text_keys}) # Convert all to string
+            processed_row['requested_date'] = parsed_date
+            return processed_row
+
+        processed_rows = [process_row(row) for row in list_of_dicts]
 
         self.current_data = processed_rows # Assign the processed list back
         print(f"Stored {len(self.current_data)} records in self.current_data.")
@@ -2949,42 +3457,45 @@ class QFTApp:
 
     def add_data_rows(self, list_of_dicts):
         """Adds new rows, ensuring date conversion (Keep Script 1)."""
-        processed_rows = []
-        for row in list_of_dicts:
-             # Process date similar to set_data_rows
-             date_val = row.get('requested_date', row.get('RequestedDate'))
-             parsed_date = None
-             if isinstance(date_val, datetime.datetime):
-                 parsed_date = date_val
-             elif isinstance(date_val, str):
-                  try:
-                       parsed_date = datetime.datetime.strptime(date_val, '%Y-%m-%d %H:%M:%S')
-                  except (ValueError, TypeError):
-                     try:
-                         parsed_date = datetime.datetime.strptime(date_val, '%d/%m/%Y %H:%M:%S')
-                     except (ValueError, TypeError):
-                          parsed_date = None
-             elif pd.isna(date_val):
-                 parsed_date = None
-             else:
-                 parsed_date = None
-             row['requested_date'] = parsed_date
-             # Convert other fields to string for consistency
-             for key in row:
-                 if key != 'requested_date':
-                     row[key] = str(row.get(key,''))
-             processed_rows.append(row)
-
-        self.current_data.extend(processed_rows)
+        def processed_rows():
+            for row in list_of_dicts:
+                 # Process date similar to set_data_rows
+                 row['requested_date'] = _parse_requested_date(row.get('requested_date', row.get('RequestedDate')))
+                 # Convert other fields to string for consistency
+                 for key in row:
+                     if key != 'requested_date':
+                         row[key] = str(row.get(key,''))
+                 yield row
+
+        # Rows are converted in place and streamed into current_data, no temporary list of them
+        self.current_data.extend(processed_rows())
         # self.update_data_info() # Placeholder call
 
+    def _rows_from_dataframe(self, df):
+        """Builds row dicts directly from a cleaned import DataFrame (skips to_dict + re-parsing)."""
+        keys = ['barcode', 'nil_result', 'tb1_result', 'tb2_result', 'mit_result', 'tb1_nil', 'tb2_nil', 'mit_nil', 'qft_result', 'requested_date']
+        df = df.reindex(columns=keys, fill_value='')
+        # Dates are already datetime64 from import; turn NaT into None like set_data_rows does
+        dates = df['requested_date']
+        df = df.assign(requested_date=dates.astype(object).where(dates.notna(), None))
+        return [dict(zip(keys, values)) for values in df.itertuples(index=False, name=None)]
+
+    def set_dataframe(self, df):
+        """Clears existing data and sets new data from an imported DataFrame."""
+        self.current_data = self._rows_from_dataframe(df)
+        if DEBUG: print(f"Stored {len(self.current_data)} records in self.current_data.")
+
+    def add_dataframe(self, df):
+        """Adds rows from an imported DataFrame to the current data."""
+        self.current_data.extend(self._rows_from_dataframe(df))
+
     def has_data(self):
         """Checks if there is data loaded (Keep Script 1)."""
         return bool(self.current_data)
 
     def get_all_barcodes(self):
-        """Returns a list of all barcodes currently loaded (Keep Script 1)."""
-        return [str(row.get('barcode', '')) for row in self.current_data]
+        """Returns the set of all barcodes currently loaded (built directly, no intermediate list)."""
+        return {str(row.get('barcode', '')) for row in self.current_data}
 
     # def update_data_info(self):
     #      """Placeholder for updating info like date ranges if needed."""
@@ -2992,12 +3503,11 @@ class QFTApp:
 
     def get_report_date_str(self):
          """Gets the latest date from the data or current date for reports (Keep Script 1)."""
-         latest_date = None
-         for row in self.current_data:
-              dt = row.get('requested_date')
-              if isinstance(dt, datetime.datetime):
-                   if latest_date is None or dt > latest_date:
-                        latest_date = dt
+         # Samples from one run share their date, so only the distinct dates go through the
+         # type check and max() (rows without a datetime are skipped)
+         datetime_cls = datetime.datetime
+         dates = {row.get('requested_date') for row in self.current_data}
+         latest_date = max((dt for dt in dates if isinstance(dt, datetime_cls)), default=None)
          return latest_date.strftime('%Y-%m-%d') if latest_date else datetime.datetime.now().strftime('%Y-%m-%d')
 
 
@@ -3034,9 +3544,49 @@ class QFTApp:
 
     # --- Display and Formatting ---
 
+    def _build_header_segments(self):
+        """Returns the header line and separator as alternating (text, tags) arguments for Text.insert."""
+        segments = []
+        last_column = len(self.headers_info) - 1
+        for i, (text, tag, width) in enumerate(self.headers_info):
+             # Pad text to fit width, add space separator (plain 'header_base' columns get no background tag)
+             segments += (f"{text:<{width}}", () if tag == 'header_base' else (tag,))
+             segments += ((" ", ()) if i < last_column else ("\n", ()))
+
+        # Separator line (Match width, accounting for spaces)
+        segments += ("-" * self.total_width + "\n", ())
+        return tuple(segments)
+
+    def _display_row_meta(self):
+        """Returns (row, QFT text, comment, row tags, QFT cell tags, comment tags) for each row of current_data."""
+        # These only depend on the row itself, and rows are the same dicts through sorting and manual
+        # ordering, so entries are kept between refreshes and only rows not seen before are computed.
+        # Entries are keyed by id(row) and hold the row, so a recycled id never matches another row.
+        previous = self._row_meta
+        new_rows = [row for row in self.current_data if previous.get(id(row), (None,))[0] is not row]
+        if new_rows:
+            # Plain calculate_comment per row: building a DataFrame for a vectorized pass costs more than
+            # it saves at any size, and would load pandas the first time a saved session is shown
+            new_comments = list(map(calculate_comment, new_rows))
+            row_tag_by_key = self.row_tag_by_key
+            qft_tag_by_key = self.qft_tag_by_key
+            for row_dict, comment in zip(new_rows, new_comments):
+                qft_result_final = str(row_dict.get('qft_result', ' ')).upper()
+                row_key = 'WP' if "WP" in comment else qft_result_final
+                # The background tag covers the whole line (newline included, so it reaches the right edge)
+                row_tag = row_tag_by_key.get(row_key)
+                row_tags = (row_tag,) if row_tag else ()
+                qft_tag = qft_tag_by_key.get(row_key)
+                previous[id(row_dict)] = (row_dict, qft_result_final, comment, row_tags,
+                                          row_tags + (qft_tag,) if qft_tag else row_tags, row_tags + ('comment',))
+        # Keep only the rows loaded now, so removed rows are released
+        self._row_meta = {id(row): previous[id(row)] for row in self.current_data}
+        return [self._row_meta[id(row)] for row in self.current_data]
+
     def refresh_display(self):
         """Populates the results Text widget with current_data (S2 Style)."""
         print("--- Refreshing Display ---")
+        self._search_barcodes = None # Rows may have changed; the next search rebuilds the barcode list
         self.results_text.config(state='normal')
         self.results_text.delete('1.0', tk.END)
 
@@ -3047,124 +3597,43 @@ class QFTApp:
             return
 
         # --- Headers (Like S2) ---
-        header_line = ""
-        tag_positions = [] # Store (tag, start_char, end_char)
-        current_pos = 0
-        # Use S2 header texts from self.headers_info
-        header_texts = [h[0] for h in self.headers_info]
-        # Use 'header_base' for Request Date
-        self.headers_info[-1] = (self.headers_info[-1][0], 'header_base', self.headers_info[-1][2])
-
-        for i, (text, tag, width) in enumerate(self.headers_info):
-             # Pad text to fit width, add space separator
-             padded_text = f"{text:<{width}}"
-             header_line += padded_text + (" " if i < len(self.headers_info) - 1 else "") # Add space between columns
-             tag_positions.append((tag, current_pos, current_pos + width))
-             current_pos += width + 1 # Add 1 for the space separator
-
-        self.results_text.insert('1.0', header_line + "\n") # Insert header line first
-        # Apply specific background tags to header segments
-        for tag, start, end in tag_positions:
-            if tag != 'header_base': # Only apply specific background if not base
-                 self.results_text.tag_add(tag, f"1.{start}", f"1.{end}")
-
-        # Separator line (Match width, accounting for spaces)
-        separator = "-" * current_pos
-        self.results_text.insert('end', separator + "\n")
-        print(f"Displayed Headers. Total width: {current_pos}")
+        # The whole document (header, separator and all rows) goes in with ONE Text.insert call;
+        # the header and separator segments never change, so they were built once in __init__
+        insert_args = list(self.header_segments)
+        print(f"Displayed Headers. Total width: {self.total_width}")
 
         # --- Data Rows ---
         decimals = app_settings['decimal_places']
         print(f"Using decimal places: {decimals}")
-        row_count = 0
-        for row_dict in self.current_data:
-            row_count += 1
-            line_start_index = self.results_text.index('end-1c linestart') # Get index before inserting
-
-            # *** Calculate comment ONCE per row ***
-            comment = calculate_comment(row_dict)
-            is_wp = "WP" in comment
-            qft_result_final = str(row_dict.get('qft_result', ' ')).upper()
-
-            # Format data for display based on headers_info
-            data_line = ""
-            tags_to_apply = [] # List of (tag, start_index, end_index) for this line
-            current_pos_data = 0
-
-            # Map keys from row_dict to the order in headers_info
-            key_map = {
-                 "Barcode": "barcode", "Nil_Result": "nil_result", "TB1_Result": "tb1_result",
-                 "TB2_Result": "tb2_result", "Mit_Result": "mit_result", "TB1_Nil": "tb1_nil",
-                 "TB2_Nil": "tb2_nil", "Mit_Nil": "mit_nil", "QFT_Result": "qft_result",
-                 "Comment": None, # Calculated
-                 "Request Date": "requested_date"
-             }
-
-            for i, (header_text, _, width) in enumerate(self.headers_info):
-                value_str = " " # Default to space
-                key = key_map.get(header_text)
-
-                if key: # Standard key lookup
-                     raw_value = row_dict.get(key, " ")
-                     if key == 'requested_date':
-                         value_str = raw_value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(raw_value, datetime.datetime) else 'No Date'
-                     elif key == 'qft_result':
-                          value_str = str(raw_value).upper()
-                     elif key == 'barcode':
-                          value_str = str(raw_value)
-                     else: # Numeric fields
-                         value_str = format_number_with_decimals(str(raw_value), decimals)
-                elif header_text == "Comment": # Calculate comment
-                     value_str = calculate_comment(row_dict)
-
-                # Pad/truncate value to fit the column width
-                padded_value = f"{str(value_str):<{width}}"[:width] # Truncate if too long
-                data_line += padded_value + (" " if i < len(self.headers_info) - 1 else "") # Add space separator
-
-                # --- Determine Cell/Row Tags ---
-                start_idx_rel_char = current_pos_data
-                end_idx_rel_char = start_idx_rel_char + width
-                tag_start = f"{line_start_index}+{start_idx_rel_char}c"
-                tag_end = f"{line_start_index}+{end_idx_rel_char}c"
-
-                # Specific tags for QFT result cell (text color only)
-                if header_text == "QFT_Result":
-                     qft_cell_tag = None
-                     if is_wp: qft_cell_tag = 'qft_wp' # WP first
-                     elif qft_result_final in ('POS', 'POS*'): qft_cell_tag = 'qft_pos'
-                     elif qft_result_final == 'NEG': qft_cell_tag = 'qft_neg'
-                     elif qft_result_final == 'IND': qft_cell_tag = 'qft_ind'
-                     if qft_cell_tag:
-                         tags_to_apply.append((qft_cell_tag, tag_start, tag_end))
-
-                # Tag for comment cell
-                if header_text == "Comment":
-                      tags_to_apply.append(('comment', tag_start, tag_end))
-
-                current_pos_data += width + 1 # Add 1 for space
-
-            # Insert the full data line
-            self.results_text.insert('end', data_line + "\n")
-            line_end_index = self.results_text.index('end-1c lineend') # End of inserted line
-
-            # Apply row background color based on QFT result
-            row_tag = None
-            if is_wp: row_tag = 'wp_row' # WP first
-            elif qft_result_final in ('POS', 'POS*'): row_tag = 'pos_row'
-            elif qft_result_final == 'NEG': row_tag = 'neg_row'
-            elif qft_result_final == 'IND': row_tag = 'ind_row'
-
-            if row_tag:
-                # Apply background tag to the entire line
-                self.results_text.tag_add(row_tag, line_start_index, line_end_index)
-
-            # Apply specific cell tags collected earlier (text colors, comment style)
-            for tag, start, end in tags_to_apply:
-                try:
-                    self.results_text.tag_add(tag, start, end)
-                except tk.TclError as tag_error:
-                     print(f"Error applying tag '{tag}' from {start} to {end}: {tag_error}")
-
+        # QFT text, comment and tags per row (kept from earlier refreshes, only new rows computed)
+        row_meta = self._display_row_meta()
+
+        # Every row is built in Python and appended to the same insert: each line is split into segments
+        # carrying the row background tag plus the QFT-color / comment tag for those two cells.
+        # (Before, each row cost an insert, two index() lookups and up to three tag_add calls.)
+        fmt = format_number_with_decimals
+        num_values = _num_values
+        datetime_cls = datetime.datetime
+        # Pad/truncate each value to its column width: one '%' per segment with the column templates
+        column_formats = self.column_formats
+        lead_format = ' '.join(column_formats[:8]) + ' ' # Barcode .. Mit_Nil
+        qft_format, comment_format = column_formats[8], column_formats[9]
+        date_format = ' ' + column_formats[10] + '\n'
+        for row_dict, qft_result_final, comment, row_tags, qft_tags, comment_tags in row_meta:
+            req_date = row_dict.get('requested_date')
+            lead_cells = (str(row_dict.get('barcode', ' ')),
+                          *[fmt(str(value), decimals) for value in num_values(row_dict)])
+            date_text = req_date.strftime('%Y-%m-%d %H:%M:%S') if isinstance(req_date, datetime_cls) else 'No Date'
+
+            insert_args += (
+                lead_format % lead_cells, row_tags,         # Barcode .. Mit_Nil
+                qft_format % qft_result_final, qft_tags,    # QFT result (text color)
+                ' ', row_tags,
+                comment_format % comment, comment_tags,     # Comment
+                date_format % date_text, row_tags,          # Request date
+            )
+        self.results_text.insert('end', *insert_args)
+        row_count = len(row_meta)
 
         print(f"Displayed {row_count} data rows.")
         # Apply search highlights if search term exists
@@ -3205,46 +3674,55 @@ class QFTApp:
 
         # Sorting logic
         try:
-            # Use a lambda function for sorting, handling potential None or errors
-            def sort_func(row_dict):
-                value = row_dict.get(sort_column)
+            # list.sort() calls the key function once per row; the per-column rules are picked
+            # once here instead of re-testing sort_column inside it for every row
+            # Values that can't be read sort after all others in either direction
+            missing = float('inf') if not reverse_order else float('-inf')
+
+            if sort_column == 'requested_date':
+                datetime_cls = datetime.datetime
+                # Should not happen if data processing is correct
+                no_date = datetime.datetime.max if not reverse_order else datetime.datetime.min
+                def typed_key(value):
+                    # Should be datetime objects, direct comparison works
+                    return value if isinstance(value, datetime_cls) else no_date
 
-                # Handle None or missing values - place them consistently
-                if value is None or (isinstance(value, str) and value.strip() == ''):
-                    # Place Nones/empty last when ascending, first when descending
-                    return (float('inf') if not reverse_order else float('-inf'))
+            elif sort_column == 'barcode':
+                # Basic string sort, consider natsort library for true natural sort if needed
+                typed_key = str
 
-                if sort_column == 'requested_date':
-                    # Should be datetime objects, direct comparison works
-                    if isinstance(value, datetime.datetime):
-                        return value
-                    else: # Should not happen if data processing is correct
-                         return (datetime.datetime.max if not reverse_order else datetime.datetime.min)
-
-                elif sort_column == 'barcode':
-                     # Basic string sort, consider natsort library for true natural sort if needed
-                     return str(value)
-
-                elif sort_column == 'qft_result':
-                    # Define custom order for QFT results
-                    order = {'POS*': 0, 'POS': 1, 'IND': 2, 'NEG': 3}
+            elif sort_column == 'qft_result':
+                # Define custom order for QFT results
+                order = {'POS*': 0, 'POS': 1, 'IND': 2, 'NEG': 3}
+                def typed_key(value):
                     return order.get(str(value).upper(), 99) # Place unknowns last
 
-                else: # Assume numeric sort for other columns
+            else: # Assume numeric sort for other columns
+                def typed_key(value):
                     try:
                          # Handle comparison symbols if sorting numeric columns
-                         val_str = str(value).replace('>', '').replace('<', '').strip()
-                         if not val_str or val_str == " ":
-                              return (float('inf') if not reverse_order else float('-inf'))
+                         val_str = str(value).translate(_SIGN_TABLE).strip()
+                         if not val_str:
+                              return missing
                          return float(val_str)
                     except (ValueError, TypeError):
                          # If conversion fails, treat as string or place based on order
                          print(f"Warning: Non-numeric value '{value}' found in supposedly numeric column '{sort_column}' during sort.")
                          # Fallback: treat non-numeric as very large/small based on direction
-                         return (float('inf') if not reverse_order else float('-inf'))
+                         return missing
 
+            # Handle None or missing values - they are split off and always placed last (in their
+            # current order), so the key function only ever sees real values of one type
+            valued_rows, missing_rows = [], []
+            for row_dict in self.current_data:
+                value = row_dict.get(sort_column)
+                if value is None or (isinstance(value, str) and value.strip() == ''):
+                    missing_rows.append(row_dict)
+                else:
+                    valued_rows.append(row_dict)
 
-            self.current_data.sort(key=sort_func, reverse=reverse_order)
+            valued_rows.sort(key=lambda row_dict: typed_key(row_dict[sort_column]), reverse=reverse_order)
+            self.current_data = valued_rows + missing_rows
             self.refresh_display() # Update view with sorted data
             self.update_status(f"Data sorted by {sort_key_display}.")
 
@@ -3256,13 +3734,12 @@ class QFTApp:
     def perform_search(self, event=None):
         """Highlights rows matching the search term in the barcode."""
         search_term = self.search_var.get().strip().lower()
-        found_count = self.apply_search_highlight() # Apply based on current term, get count
+        # Apply based on current term, get count and the first matching line in the same pass
+        found_count, first_match_index = self.apply_search_highlight()
         if search_term:
             if found_count > 0:
-                # Find the first match and scroll to it
-                first_match_index = self.find_first_search_match(search_term)
-                if first_match_index:
-                    self.results_text.see(first_match_index)
+                # Scroll to the first match
+                self.results_text.see(first_match_index)
                 self.update_status(f"Found {found_count} match(es) for '{search_term}'.")
             else:
                 self.update_status(f"No matches found for '{search_term}'.")
@@ -3277,74 +3754,35 @@ class QFTApp:
         self.update_status("Search cleared.")
 
     def apply_search_highlight(self):
-        """Applies or removes search highlights based on self.search_var. Returns count."""
+        """Applies or removes search highlights based on self.search_var. Returns (count, first match index)."""
         search_term = self.search_var.get().strip().lower()
         match_count = 0
+        first_match_index = None # 'line.char' of the first highlighted line, for perform_search to scroll to
         self.results_text.config(state='normal')
         self.results_text.tag_remove('search_highlight', '1.0', tk.END) # Clear previous
 
         if search_term and self.current_data:
-            # Iterate through lines in the Text widget more carefully
-            # Header lines = 2 (Header + Separator)
-            start_line_index = 3 # Data starts on line 3 (1-based index)
-            end_line_index = int(self.results_text.index('end-1c').split('.')[0])
-
-            # Determine the character range for the barcode column
-            barcode_col_index = -1
-            barcode_start_char = 0
-            barcode_end_char = 0
-            current_char = 0
-            for i, (text, _, width) in enumerate(self.headers_info):
-                if text == "Barcode":
-                    barcode_col_index = i
-                    barcode_start_char = current_char
-                    barcode_end_char = current_char + width
-                    break
-                current_char += width + 1 # Account for space separator
-
-            if barcode_col_index != -1:
-                for i in range(start_line_index, end_line_index + 1):
-                    line_content = self.results_text.get(f"{i}.0", f"{i}.end")
-                    # Extract barcode using character indices
-                    barcode_in_line = line_content[barcode_start_char:barcode_end_char].strip().lower()
-
-                    if search_term in barcode_in_line:
-                        self.results_text.tag_add('search_highlight', f"{i}.0", f"{i}.end")
-                        match_count += 1
-
-        self.results_text.config(state='disabled')
-        return match_count # Return the number of matches found
-
-    def find_first_search_match(self, search_term):
-        """Finds the index ('line.char') of the first search match (Keep Script 1)."""
-        if not search_term or not self.current_data:
-            return None
-
-        search_term = search_term.lower()
-        # Header lines = 2 (Header + Separator)
-        start_line_index = 3 # Data starts on line 3 (1-based index)
-        end_line_index = int(self.results_text.index('end-1c').split('.')[0])
-
-        barcode_col_index = -1
-        barcode_start_char = 0
-        barcode_end_char = 0
-        current_char = 0
-        for i, (text, _, width) in enumerate(self.headers_info):
-            if text == "Barcode":
-                 barcode_col_index = i
-                 barcode_start_char = current_char
-                 barcode_end_char = current_char + width
-                 break
-            current_char += width + 1
-
-        if barcode_col_index != -1:
-            for i in range(start_line_index, end_line_index + 1):
-                line_content = self.results_text.get(f"{i}.0", f"{i}.end")
-                barcode_in_line = line_content[barcode_start_char:barcode_end_char].strip().lower()
+            # Matches are found in current_data instead of reading every line back out of the Text
+            # widget: refresh_display shows row i on line i + 3 (after the header and separator).
+            # All matching lines are then tagged with ONE tag_add call (it takes any number of ranges)
+            match_ranges = []
+            barcodes = self._search_barcodes
+            if barcodes is None:
+                # Normalized once per refresh, not on every search: same text as the displayed cell
+                # (the barcode cut to its column width), stripped and lowercased
+                barcode_width = self.column_widths[0] # Barcode is the first column
+                barcodes = self._search_barcodes = [str(row_dict.get('barcode', ' '))[:barcode_width].strip().lower()
+                                                    for row_dict in self.current_data]
+            for line_no, barcode_in_line in enumerate(barcodes, 3):
                 if search_term in barcode_in_line:
-                    return f"{i}.0" # Return start index of the line
-        return None
+                    match_ranges += (f"{line_no}.0", f"{line_no}.end")
+            if match_ranges:
+                self.results_text.tag_add('search_highlight', *match_ranges)
+                match_count = len(match_ranges) // 2
+                first_match_index = match_ranges[0]
 
+        self.results_text.config(state='disabled')
+        return match_count, first_match_index
 
     # --- Status Bar & User Feedback (Keep Script 1's) ---
     def update_status(self, message, show_progress=False, hide_progress=False):
@@ -3435,10 +3873,8 @@ if __name__ == "__main__":
     # Create database and directories if they don't exist
     try:
         get_app_data_dir() # Ensure directory exists
-        db_conn_test = get_database_connection()
-        if db_conn_test:
-            db_conn_test.close()
-        else:
+        # Opens (and keeps) the shared connection, creating tables on first run
+        if not get_database_connection():
              # Show error and exit if DB connection failed critically
              messagebox.showerror("Fatal Error", "Could not initialize the application database. Exiting.")
              sys.exit(1)